@@ -3,18 +3,24 @@ Module to generate domain names using various methods for enumeration and reconn
 """
 
 # imports
+import asyncio
+import collections
+import functools
+import io
+import itertools
 import json
 import logging
 import random
+import re
 from pathlib import Path
-from typing import Optional
-
-import dns.exception
+from typing import Callable, Iterable, Optional
 
 # packages
+import dns.asyncresolver
+import dns.exception
 import dns.resolver
 import httpx
-import lxml.html
+import lxml.etree
 import marisa_trie
 
 # project import
@@ -27,6 +33,32 @@ LOGGER = logging.getLogger(__name__)
 DEFAULT_DATA_PATH = Path().home() / ".alea" / "web-survey"
 DEFAULT_DICTIONARY_PATH = Path("resources") / "words"
 DEFAULT_DOMAIN_PATH = DEFAULT_DATA_PATH / CONFIG.domain_path
+DEFAULT_TLD_LIST_URL = (
+    "https://en.wikipedia.org/wiki/List_of_Internet_top-level_domains"
+)
+
+# characters that are not valid in a DNS label or domain name
+INVALID_DOMAIN_CHARS_RE = re.compile(r"[^a-z0-9.\-]")
+
+# number of method tables remembered per generator
+DEFAULT_METHOD_TABLE_CACHE_SIZE = 8
+
+# memory-mapped domain tries by path, shared by every generator in the process
+DOMAIN_TRIES: dict[str, marisa_trie.Trie] = {}  # pylint: disable=c-extension-no-member
+
+
+@functools.lru_cache(maxsize=1)
+def get_dns_resolver() -> dns.asyncresolver.Resolver:
+    """
+    Get the async resolver shared by all lookups in the process.
+
+    The nameserver configuration is read on first use rather than at import, so a missing
+    resolv.conf only fails the lookups that need it.
+
+    Returns:
+        dns.asyncresolver.Resolver: The shared resolver.
+    """
+    return dns.asyncresolver.Resolver()
 
 
 class DomainGenerator:
@@ -34,26 +66,38 @@ class DomainGenerator:
     A class to generate domain names using various methods.
 
     Attributes:
-        known_domains (list): List of known domain names.
+        known_domains (marisa_trie.Trie): Trie of known domain names.
         known_tlds (list): List of known top-level domains (TLDs).
         dictionary_words (list): List of words from the dictionary.
+        reverse_words (marisa_trie.Trie): Trie of reversed dictionary words for suffix queries.
     """
 
     def __init__(
         self,
         dictionary_file: Optional[Path] = None,
+        known_domains: Optional[marisa_trie.Trie] = None,  # pylint: disable=c-extension-no-member
     ):
         """
         Initialize the DomainGenerator with files containing known domains, TLDs, and a dictionary.
 
         Args:
             dictionary_file (Path): Path to the file containing the dictionary words.
+            known_domains (marisa_trie.Trie): Shared trie of known domain names, loaded from
+                the data path if not provided.
         """
-        self.known_domains = self.load_domain_list()
+        self.known_domains = (
+            known_domains if known_domains is not None else self.load_domain_list()
+        )
         self.dictionary_words = self.load_dictionary(
             dictionary_file or DEFAULT_DICTIONARY_PATH
         )
         self.known_tlds = self.load_tld_list()
+        self.reverse_words = self.build_reverse_trie(self.dictionary_words)
+        self._words_by_suffix: dict[str, list[str]] = {}
+        self._method_tables: collections.OrderedDict[
+            tuple[tuple[str, float], ...],
+            tuple[tuple[Callable[[], str], ...], tuple[float, ...]],
+        ] = collections.OrderedDict()
 
     @staticmethod
     def load_dictionary(file_path: Path) -> list[str]:
@@ -73,23 +117,43 @@ class DomainGenerator:
         ]
 
     @staticmethod
-    def load_domain_list():
+    def build_reverse_trie(words: Iterable[str]) -> marisa_trie.Trie:  # pylint: disable=c-extension-no-member
+        """
+        Build a trie of reversed strings, so suffix queries become prefix queries.
+
+        Args:
+            words (Iterable[str]): Strings to store reversed.
+
+        Returns:
+            marisa_trie.Trie: Trie of the reversed strings.
+        """
+        return marisa_trie.Trie(word[::-1] for word in words)  # pylint: disable=c-extension-no-member
+
+    @staticmethod
+    def load_domain_list() -> marisa_trie.Trie:  # pylint: disable=c-extension-no-member
         """
-        Load a list of known domain names from a file.
+        Load the trie of known domain names from a file.
+
+        The trie is memory-mapped rather than read, and kept for the life of the process,
+        so every generator and every worker process shares the same page cache.
 
         Returns:
-            list: List of known domain names.
+            marisa_trie.Trie: Trie of known domain names.
         """
-        domain_trie_path = DEFAULT_DATA_PATH / "domains.trie"
-        domain_trie = marisa_trie.Trie()  # pylint: disable=c-extension-no-member
-        domain_trie.load(domain_trie_path.as_posix())
-        return list(domain_trie.keys())
+        domain_trie_path = (DEFAULT_DATA_PATH / "domains.trie").as_posix()
+        domain_trie = DOMAIN_TRIES.get(domain_trie_path)
+        if domain_trie is None:
+            domain_trie = marisa_trie.Trie()  # pylint: disable=c-extension-no-member
+            domain_trie.mmap(domain_trie_path)
+            DOMAIN_TRIES[domain_trie_path] = domain_trie
+        return domain_trie
 
     @staticmethod
     def load_tld_list(force_update: bool = False) -> list[str]:
         """
         Get the list of TLDs from wiki and return them as a list.  Check
-        for cached file first.
+        for cached file first.  When updating, the ETag and Last-Modified values from
+        the previous download are sent so an unchanged page is not downloaded again.
 
         Args:
             force_update (bool): Force update of the cached file.
@@ -102,23 +166,78 @@ class DomainGenerator:
         if tld_file.exists() and not force_update:
             return json.loads(tld_file.read_text(encoding="utf-8"))
 
+        # send the validators from the last download so an unchanged page returns 304
+        validators = [
+            (DEFAULT_DATA_PATH / "tld.etag", "ETag", "If-None-Match"),
+            (
+                DEFAULT_DATA_PATH / "tld.last_modified",
+                "Last-Modified",
+                "If-Modified-Since",
+            ),
+        ]
+        request_headers = {}
+        if tld_file.exists():
+            for validator_file, _, request_header in validators:
+                if validator_file.exists():
+                    request_headers[request_header] = validator_file.read_text(
+                        encoding="utf-8"
+                    ).strip()
+
         try:
-            tld_page = httpx.get(
-                "https://en.wikipedia.org/wiki/List_of_Internet_top-level_domains"
-            ).content
-            page = lxml.html.fromstring(tld_page)
-            tld_list = [
-                tld.text.strip().strip(".")
-                for tld in page.xpath(".//td")
-                if tld.text and tld.text.startswith(".")
-            ]
+            response = httpx.get(DEFAULT_TLD_LIST_URL, headers=request_headers)
+            if response.status_code == 304:
+                LOGGER.info("TLD list is unchanged since the last download.")
+                return json.loads(tld_file.read_text(encoding="utf-8"))
+
+            # stream the table cells and free each one after reading it
+            tld_list = []
+            for _, cell in lxml.etree.iterparse(
+                io.BytesIO(response.content), html=True, tag="td"
+            ):
+                if cell.text and cell.text.startswith("."):
+                    tld_list.append(cell.text.strip().strip("."))
+                cell.clear(keep_tail=True)
             tld_file.write_text(json.dumps(tld_list), encoding="utf-8")
+
+            # store the validators for the next refresh
+            for validator_file, response_header, _ in validators:
+                validator_value = response.headers.get(response_header)
+                if validator_value:
+                    validator_file.write_text(validator_value, encoding="utf-8")
+                else:
+                    validator_file.unlink(missing_ok=True)
+
             return tld_list
         except Exception as e:  # pylint: disable=broad-except
             LOGGER.error("Failed to retrieve TLD list: %s", e)
             return []
 
-    def enumerate_domain(self, target_domain: str) -> list[str]:
+    @staticmethod
+    async def resolve_records(target_domain: str, record_type: str) -> list[str]:
+        """
+        Resolve a single DNS record type for a given domain.
+
+        Args:
+            target_domain (str): The domain to query.
+            record_type (str): The DNS record type to query.
+
+        Returns:
+            list[str]: List of records as text, or an empty list if none were found.
+        """
+        try:
+            answers = await get_dns_resolver().resolve(
+                target_domain, record_type, lifetime=CONFIG.dns_resolve_timeout
+            )
+            return [rdata.to_text() for rdata in answers]
+        except (
+            dns.resolver.NoAnswer,
+            dns.resolver.NXDOMAIN,
+            dns.resolver.NoNameservers,
+            dns.exception.Timeout,
+        ):
+            return []
+
+    async def enumerate_domain(self, target_domain: str) -> list[str]:
         """
         Enumerate DNS records of various types for a given domain.
 
@@ -130,23 +249,15 @@ class DomainGenerator:
         """
         # DNS record types to query
         record_types = ["A", "AAAA", "CNAME", "MX"]
-        resolver = dns.resolver.Resolver()
-        dns_records = {}
 
-        # Query each record type
-        for record_type in record_types:
-            try:
-                answers = resolver.resolve(
-                    target_domain, record_type, lifetime=CONFIG.dns_resolve_timeout
-                )
-                dns_records[record_type] = [rdata.to_text() for rdata in answers]
-            except (
-                dns.resolver.NoAnswer,
-                dns.resolver.NXDOMAIN,
-                dns.resolver.NoNameservers,
-                dns.exception.Timeout,
-            ):
-                continue
+        # query each record type concurrently
+        results = await asyncio.gather(
+            *(
+                self.resolve_records(target_domain, record_type)
+                for record_type in record_types
+            )
+        )
+        dns_records = dict(zip(record_types, results))
 
         # filter the DNS records to things that look like a domain name
         subdomain_list = []
@@ -162,9 +273,9 @@ class DomainGenerator:
         Sample a random known domain.
 
         Returns:
-            str: A random domain from the known domains list.
+            str: A random domain from the known domains trie.
         """
-        return random.choice(self.known_domains)
+        return self.known_domains.restore_key(random.randrange(len(self.known_domains)))
 
     def get_random_known_domain_tld(self) -> str:
         """
@@ -195,9 +306,7 @@ class DomainGenerator:
         Returns:
             str: The input string converted to a valid domain.
         """
-        return "".join(
-            [c.lower() for c in input_string if c.isalnum() or c in ["-", "."]]
-        )
+        return INVALID_DOMAIN_CHARS_RE.sub("", input_string.lower())
 
     def get_random_words_domain(self, min_words: int = 1, max_words: int = 3) -> str:
         """
@@ -213,8 +322,8 @@ class DomainGenerator:
         # sample number of words
         num_words = random.randint(min_words, max_words)
 
-        # get the random words
-        words = random.sample(self.dictionary_words, num_words)
+        # get the random words, sampled with replacement
+        words = random.choices(self.dictionary_words, k=num_words)
 
         # choose a separate randomly
         separator = random.choice(["", "-", "."])
@@ -248,6 +357,30 @@ class DomainGenerator:
         # combine the charachters
         return f"{''.join(characters)}.{tld}"
 
+    def get_words_with_suffix(self, suffix: str) -> list[str]:
+        """
+        Get the dictionary words that end with a suffix, excluding the suffix itself.
+
+        The reversed-word trie answers the query in O(len(suffix)) plus the matches, and
+        results are memoized per suffix so repeated queries for a TLD are a dict lookup.
+
+        Args:
+            suffix (str): The suffix to match.
+
+        Returns:
+            list[str]: Words ending with the suffix.
+        """
+        words = self._words_by_suffix.get(suffix)
+        if words is None:
+            reversed_suffix = suffix[::-1]
+            words = [
+                key[::-1]
+                for key in self.reverse_words.keys(reversed_suffix)
+                if key != reversed_suffix
+            ]
+            self._words_by_suffix[suffix] = words
+        return words
+
     def get_random_domain_tld_suffix(self) -> str:
         """
         Generate domains using domain hacks (e.g., using TLD as part of the word).
@@ -259,12 +392,8 @@ class DomainGenerator:
         tld = random.choice(self.known_tlds)
 
         # find a dictionary word that ends with it
-        valid_words = [
-            word
-            for word in self.dictionary_words
-            if word.endswith(tld) and len(word) > len(tld)
-        ]
-        if len(valid_words) == 0:
+        valid_words = self.get_words_with_suffix(tld)
+        if not valid_words:
             return self.get_random_words_domain()
 
         # pick a random word
@@ -297,21 +426,65 @@ class DomainGenerator:
         # fall back on this
         return self.get_random_known_domain()
 
+    def get_method_table(
+        self, method_weights: dict[str, float]
+    ) -> tuple[tuple[Callable[[], str], ...], tuple[float, ...]]:
+        """
+        Get the bound generation methods and their cumulative weights.
+
+        The most recently used tables are memoized by the weights' contents, so repeated
+        calls with the same weights skip rebuilding the lists and running totals that
+        random.choices would otherwise compute.
+
+        Args:
+            method_weights (dict[str, float]): Map of method name to weight.
+
+        Returns:
+            tuple: The bound methods and their cumulative weights.
+
+        Raises:
+            ValueError: If none of the method names exist on the generator.
+        """
+        # key on the contents, so fresh or mutated dicts never reuse a stale table
+        table_key = tuple(method_weights.items())
+        entry = self._method_tables.get(table_key)
+        if entry is not None:
+            self._method_tables.move_to_end(table_key)
+            return entry
+
+        # resolve the methods once, skipping names that do not exist
+        methods = []
+        weights = []
+        for method, weight in method_weights.items():
+            try:
+                methods.append(getattr(self, method))
+                weights.append(weight)
+            except AttributeError:
+                LOGGER.error("Unknown domain generation method: %s", method)
+        if not methods:
+            raise ValueError(f"No known domain generation methods in {method_weights}")
+
+        # build and remember the table, evicting the least recently used
+        entry = (tuple(methods), tuple(itertools.accumulate(weights)))
+        self._method_tables[table_key] = entry
+        if len(self._method_tables) > DEFAULT_METHOD_TABLE_CACHE_SIZE:
+            self._method_tables.popitem(last=False)
+        return entry
+
     def generate(self, method_weights: Optional[dict[str, float]] = None) -> str:
         """
         Randomly select and return a domain name generated using one of the methods.
         """
         # get config default if not set
-        method_weights = method_weights or CONFIG.domain_weights
+        methods, cum_weights = self.get_method_table(
+            method_weights or CONFIG.domain_weights
+        )
 
         # randomly select a method
         while True:
-            method = random.choices(
-                list(method_weights.keys()), weights=list(method_weights.values()), k=1
-            )[0]
+            method = random.choices(methods, cum_weights=cum_weights, k=1)[0]
             try:
-                if method in method_weights:
-                    return getattr(self, method)()
+                return method()
             except Exception as e:  # pylint: disable=broad-except
                 LOGGER.error("Error generating domain: %s", e)
                 continue
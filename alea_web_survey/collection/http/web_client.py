@@ -4,21 +4,31 @@ httpx web resource collector module.
 
 # imports
 import asyncio
+import collections
+import email.utils
+import functools
 import hashlib
+import inspect
 import json
 import logging
+import re
 import urllib.parse
-import urllib.robotparser
-from functools import cache
-from typing import AsyncIterator, List, Optional, Tuple
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
 
 # packages
-import dateutil.parser
-import dns.resolver
 import httpx
-from playwright.async_api import async_playwright
+from playwright.async_api import Browser, Playwright, async_playwright
 
 # project imports
+from alea_web_survey.collection.dns.domain_generator import get_dns_resolver
 from alea_web_survey.config import CONFIG
 from alea_web_survey.models.web_resource import WebResource
 
@@ -28,11 +38,17 @@ LOGGER = logging.getLogger(__name__)
 # module default constants
 DEFAULT_MAX_CONNECTIONS = CONFIG.http_pool_size
 DEFAULT_MAX_KEEPALIVE = CONFIG.http_keep_alive
+DEFAULT_MAX_DOMAINS = CONFIG.http_max_domains
 DEFAULT_NETWORK_TIMEOUT = CONFIG.http_network_timeout
 DEFAULT_PLAYWRIGHT_TIMEOUT = CONFIG.playwright_timeout
 DEFAULT_USER_AGENT = CONFIG.user_agent
 DEFAULT_PATH_LIST = CONFIG.path_list
 DEFAULT_MAX_SITEMAPS = 10
+DEFAULT_NOSCRIPT_WINDOW = 4096
+DEFAULT_STREAM_CHUNK_SIZE = 65536
+DEFAULT_HOST_CACHE_SIZE = 65536
+DEFAULT_RESOURCE_CACHE_SIZE = 256
+DEFAULT_HASH_THREAD_SIZE = 262144
 
 # set up default timeout config
 DEFAULT_TIMEOUT_CONFIG = httpx.Timeout(
@@ -42,32 +58,146 @@ DEFAULT_TIMEOUT_CONFIG = httpx.Timeout(
     pool=CONFIG.http_connect_timeout,
 )
 
+# case-insensitive noscript tag patterns, so page bodies never need to be lowercased
+NOSCRIPT_OPEN_RE = re.compile(rb"<noscript>", re.IGNORECASE)
+NOSCRIPT_CLOSE_RE = re.compile(rb"</noscript>", re.IGNORECASE)
+
+# robots.txt directives needed for crawl planning; allow/disallow only end user-agent groups
+ROBOTS_DIRECTIVE_RE = re.compile(
+    rb"^[ \t]*(user-agent|crawl-delay|sitemap|allow|disallow)[ \t]*:[ \t]*([^\s#]*)",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def async_lru(key: str, maxsize: int) -> Callable:
+    """
+    Memoize a coroutine function on a single hashable argument.
+
+    The first call for a key runs the coroutine as a task; concurrent and later callers
+    await the same task instead of repeating the work.  Failed or cancelled calls, and
+    calls that return None, are evicted so they can be retried.
+
+    Args:
+        key: The name of the argument to key the cache on.
+        maxsize: The maximum number of results to retain.
+
+    Returns:
+        The decorator.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        tasks: collections.OrderedDict[Any, asyncio.Task] = collections.OrderedDict()
+
+        def evict_failed(cache_key: Any, task: asyncio.Task) -> None:
+            if (
+                task.cancelled()
+                or task.exception() is not None
+                or task.result() is None
+            ):
+                if tasks.get(cache_key) is task:
+                    del tasks[cache_key]
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            cache_key = signature.bind(*args, **kwargs).arguments[key]
+            task = tasks.get(cache_key)
+            if task is None:
+                task = asyncio.ensure_future(func(*args, **kwargs))
+                task.add_done_callback(functools.partial(evict_failed, cache_key))
+                tasks[cache_key] = task
+                if len(tasks) > maxsize:
+                    tasks.popitem(last=False)
+            else:
+                tasks.move_to_end(cache_key)
+
+            # shield so that a cancelled caller does not cancel the shared task
+            return await asyncio.shield(task)
+
+        return wrapper
+
+    return decorator
+
 
 class WebResourceCollector:
     """
     Class to efficiently retrieve web resources from a server.
     """
 
+    # shared headless browser, launched lazily on first use and reused across pages
+    _playwright: Optional[Playwright] = None
+    _browser: Optional[Browser] = None
+    _browser_lock: Optional[asyncio.Lock] = None
+
     def __init__(
         self,
         max_connections: int = DEFAULT_MAX_CONNECTIONS,
         max_keepalive: int = DEFAULT_MAX_KEEPALIVE,
+        max_domains: int = DEFAULT_MAX_DOMAINS,
     ):
         """
         Initialize the WebResourceCollector.
 
         Args:
-            max_connections: The maximum number of connections to open.
-            max_keepalive: The maximum number of keepalive connections to maintain.
+            max_connections: The maximum number of connections to open per domain.
+            max_keepalive: The maximum number of keepalive connections to maintain per domain.
+            max_domains: The maximum number of domains to crawl concurrently.
 
         Returns:
             None
         """
         self.max_connections = max_connections
         self.max_keepalive = max_keepalive
+        self.max_domains = max_domains
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Get the shared HTTP client for this collector, creating it on first use.
+
+        The client is reused across domains so connection pools and SSL context are
+        only set up once per collector.
+
+        Returns:
+            The shared httpx.AsyncClient object.
+        """
+        if self._client is None or self._client.is_closed:
+            # size the shared pool for every concurrent domain; get_resources caps each domain
+            limits = httpx.Limits(
+                max_connections=self.max_connections * self.max_domains,
+                max_keepalive_connections=self.max_keepalive * self.max_domains,
+            )
+
+            # negotiate HTTP/2 via ALPN where supported, so paths share one connection per origin
+            self._client = httpx.AsyncClient(
+                http1=True,
+                http2=True,
+                timeout=DEFAULT_TIMEOUT_CONFIG,
+                headers={"User-Agent": DEFAULT_USER_AGENT},
+                transport=httpx.AsyncHTTPTransport(
+                    verify=False,
+                    http1=True,
+                    http2=True,
+                    limits=limits,
+                    retries=0,
+                ),
+            )
+
+        return self._client
+
+    async def aclose(self) -> None:
+        """
+        Close the shared HTTP client, if open.
+
+        Returns:
+            None
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     @staticmethod
-    @cache
+    @async_lru(key="domain", maxsize=DEFAULT_HOST_CACHE_SIZE)
     async def check_host(domain: str) -> Optional[Tuple[str, str]]:
         """
         Check if the host is live by attempting to connect to port 443 (HTTPS), then port 80 (HTTP).
@@ -80,9 +210,10 @@ class WebResourceCollector:
         """
         # Resolve domain to IP address
         try:
-            ip_address = dns.resolver.resolve(
+            answer = await get_dns_resolver().resolve(
                 domain, "A", lifetime=DEFAULT_NETWORK_TIMEOUT
-            )[0].address
+            )
+            ip_address = answer[0].address
             # LOGGER.debug(f"Resolved {domain} to {ip_address}.")
             LOGGER.debug("Resolved %s to %s.", domain, ip_address)
         except Exception as e:  # pylint: disable=broad-except
@@ -121,7 +252,25 @@ class WebResourceCollector:
         return None
 
     @staticmethod
-    @cache
+    async def hash_content(content: bytes) -> str:
+        """
+        Compute the BLAKE2b hash of the content, hashing large bodies in a worker thread.
+
+        Args:
+            content: The content to hash.
+
+        Returns:
+            The hex digest of the content.
+        """
+        # small bodies are cheaper to hash inline than to hand off
+        if len(content) < DEFAULT_HASH_THREAD_SIZE:
+            return hashlib.blake2b(content).hexdigest()
+
+        # hashlib releases the GIL on large buffers, so the loop keeps running
+        digest = await asyncio.to_thread(hashlib.blake2b, content)
+        return digest.hexdigest()
+
+    @staticmethod
     def requires_playwright(content: bytes) -> bool:
         """
         Check if the content requires Playwright to render.
@@ -133,21 +282,103 @@ class WebResourceCollector:
             True if the content requires Playwright, False otherwise.
         """
         # check for a noscript tag with javascript contained within
-        lower_content = content.lower()
-        p0 = lower_content.find(b"<noscript>")
-        if p0 == -1:
+        open_match = NOSCRIPT_OPEN_RE.search(content)
+        if open_match is None:
             return False
 
+        # only lowercase a bounded window after the tag
+        p0 = open_match.start()
+        window = content[p0 : open_match.end() + DEFAULT_NOSCRIPT_WINDOW]
+
         # handle case where noscript tag is found or somehow not
-        p1 = lower_content.find(b"</noscript>", p0)
-        if p1 == -1:
-            p1 = min(p0 + 256, len(lower_content))
+        close_match = NOSCRIPT_CLOSE_RE.search(window)
+        p1 = close_match.start() if close_match else min(256, len(window))
 
-        return b"javascript" in lower_content[p0:p1]
+        return b"javascript" in window[:p1].lower()
 
     @staticmethod
-    @cache
-    async def fetch_content_playwright(url: str) -> bytes:
+    def parse_robots(content: bytes) -> Tuple[Optional[float], List[str]]:
+        """
+        Extract the crawl delay for the default user-agent and any sitemap URLs from robots.txt.
+
+        Args:
+            content: The raw robots.txt content.
+
+        Returns:
+            Tuple of the crawl delay for "*" (or None if not set) and the list of sitemap URLs.
+        """
+        crawl_delay: Optional[float] = None
+        site_maps: List[str] = []
+
+        # consecutive user-agent lines form one group; any other directive closes the list
+        in_agent_list = False
+        in_default_group = False
+        for match in ROBOTS_DIRECTIVE_RE.finditer(content):
+            directive = match.group(1).lower()
+            value = match.group(2)
+
+            if directive == b"user-agent":
+                if not in_agent_list:
+                    in_default_group = False
+                in_default_group = in_default_group or value == b"*"
+                in_agent_list = True
+                continue
+            in_agent_list = False
+
+            if directive == b"sitemap":
+                if value:
+                    site_maps.append(value.decode("utf-8", errors="replace"))
+            elif directive == b"crawl-delay" and in_default_group:
+                if crawl_delay is None:
+                    try:
+                        crawl_delay = max(0.0, float(value))
+                    except ValueError:
+                        LOGGER.debug("Invalid crawl delay in robots.txt: %r", value)
+
+        return crawl_delay, site_maps
+
+    @classmethod
+    async def _ensure_browser(cls) -> Browser:
+        """
+        Get the shared headless browser, launching it on first use.
+
+        Returns:
+            The shared Browser object.
+        """
+        lock = cls._browser_lock = cls._browser_lock or asyncio.Lock()
+
+        async with lock:
+            if cls._browser is None or not cls._browser.is_connected():
+                if cls._playwright is None:
+                    cls._playwright = await async_playwright().start()
+                LOGGER.info("Launching shared Playwright browser...")
+                cls._browser = await cls._playwright.chromium.launch(headless=True)
+
+        return cls._browser
+
+    @classmethod
+    async def close_browser(cls) -> None:
+        """
+        Close the shared headless browser and stop Playwright, if running.
+
+        Returns:
+            None
+        """
+        try:
+            if cls._browser is not None:
+                await cls._browser.close()
+            if cls._playwright is not None:
+                await cls._playwright.stop()
+        except Exception as e:  # pylint: disable=broad-except
+            LOGGER.error("Failed to close Playwright browser: %s", e)
+        finally:
+            cls._browser = None
+            cls._playwright = None
+            cls._browser_lock = None
+
+    @classmethod
+    @async_lru(key="url", maxsize=DEFAULT_RESOURCE_CACHE_SIZE)
+    async def fetch_content_playwright(cls, url: str) -> bytes:
         """
         Fetch a resource using Playwright and return a WebResource object.
 
@@ -160,38 +391,38 @@ class WebResourceCollector:
         # log it
         LOGGER.info("Fetching %s with Playwright...", url)
 
-        # retrieve the page
-        async with async_playwright() as p:
-            # launch browser and create a new page
-            browser = await p.chromium.launch(headless=True)
+        # get the shared browser and open an isolated context for this page
+        browser = await cls._ensure_browser()
+        context = await browser.new_context()
 
-            # create a new page and wait for it to load
-            try:
-                page = await browser.new_page()
-                LOGGER.info("Fetching page...")
-                await page.goto(url, timeout=DEFAULT_PLAYWRIGHT_TIMEOUT)
-
-                # wait for the page to finish rendering
-                LOGGER.info("Waiting for page to load...")
-                await page.wait_for_load_state(
-                    "networkidle", timeout=DEFAULT_PLAYWRIGHT_TIMEOUT
-                )
+        # create a new page and wait for it to load
+        try:
+            page = await context.new_page()
+            LOGGER.info("Fetching page...")
+            await page.goto(url, timeout=DEFAULT_PLAYWRIGHT_TIMEOUT)
+
+            # wait for the page to finish rendering
+            LOGGER.info("Waiting for page to load...")
+            await page.wait_for_load_state(
+                "networkidle", timeout=DEFAULT_PLAYWRIGHT_TIMEOUT
+            )
 
-                # get the content
-                LOGGER.info("Getting page content...")
-                content = await page.content()
-            except Exception as e:  # pylint: disable=broad-except
-                LOGGER.error("Failed to fetch %s with Playwright: %s", url, e)
-                content = ""
-            finally:
-                await browser.close()
+            # get the content
+            LOGGER.info("Getting page content...")
+            content = await page.content()
+        except Exception as e:  # pylint: disable=broad-except
+            LOGGER.error("Failed to fetch %s with Playwright: %s", url, e)
+            content = ""
+        finally:
+            await context.close()
 
         return content.encode("utf-8")
 
     @staticmethod
-    @cache
     async def fetch_resource(
-        client: httpx.AsyncClient, url: str, ip_address: Optional[str] = None
+        client: httpx.AsyncClient,
+        url: str,
+        ip_address: Optional[str] = None,
     ) -> Optional[WebResource]:
         """
         Fetch a resource and return a WebResource object.
@@ -210,30 +441,29 @@ class WebResourceCollector:
             return cached_resource
 
         try:
-            response = await client.get(url, follow_redirects=True)
-
-            # get best IP
-            try:
-                response_ip, _ = response.extensions["network_stream"].get_extra_info(
-                    "server_addr"
-                )
-            except Exception:  # pylint: disable=broad-except
-                response_ip = ip_address or ""
-
-            # get the content
-            content = response.content
-
-            # init headers and scan case-insensitively
-            content_type = "text/plain"
+            # stream the body so it is hashed chunk by chunk as it arrives
+            hasher = hashlib.blake2b()
+            chunks = []
+            async with client.stream("GET", url, follow_redirects=True) as response:
+                async for chunk in response.aiter_bytes(DEFAULT_STREAM_CHUNK_SIZE):
+                    hasher.update(chunk)
+                    chunks.append(chunk)
+
+            # join the content once and release the chunks
+            content = b"".join(chunks)
+            chunks.clear()
+            hash_value = hasher.hexdigest()
+
+            # get the headers; httpx headers are case-insensitive
+            content_type = response.headers.get("content-type", "text/plain")
             last_modified = None
-            for key, value in response.headers.items():
-                if key.lower() == "content-type":
-                    content_type = value
-                elif key.lower() == "last-modified":
-                    try:
-                        last_modified = dateutil.parser.parse(value)
-                    except Exception as e:  # pylint: disable=broad-except
-                        LOGGER.error("Failed to parse last modified date: %s", e)
+            if last_modified_header := response.headers.get("last-modified"):
+                try:
+                    last_modified = email.utils.parsedate_to_datetime(
+                        last_modified_header
+                    )
+                except Exception as e:  # pylint: disable=broad-except
+                    LOGGER.error("Failed to parse last modified date: %s", e)
 
             # check if the content requires Playwright and fetch it
             if WebResourceCollector.requires_playwright(
@@ -241,13 +471,14 @@ class WebResourceCollector:
             ) and response.status_code in (200, 301):
                 content = await WebResourceCollector.fetch_content_playwright(url)
 
-            # Compute BLAKE2b hash
-            hash_value = hashlib.blake2b(content).hexdigest()
+                # rehash the rendered content
+                hash_value = await WebResourceCollector.hash_content(content)
 
-            # Create WebResource object
+            # Create WebResource object; the IP is the one resolved for the domain,
+            # even if a redirect moved to another host
             web_resource = WebResource(
                 url=url,
-                ip=response_ip,
+                ip=ip_address or "",
                 status=response.status_code,
                 hash=hash_value,
                 size=len(content),
@@ -304,6 +535,34 @@ class WebResourceCollector:
         # save the content
         content_path.write_text(json.dumps(page_data, indent=2))
 
+    async def _delayed_fetch(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        *,
+        ip_address: Optional[str],
+        delay: float,
+        semaphore: asyncio.Semaphore,
+    ) -> Optional[WebResource]:
+        """
+        Wait for a scheduled delay, then fetch a resource while holding the semaphore.
+
+        Args:
+            client: The httpx.AsyncClient object to use for fetching.
+            url: The URL of the resource to fetch.
+            ip_address: The IP address of the server, if known.
+            delay: The number of seconds to wait before fetching.
+            semaphore: The semaphore bounding concurrent requests.
+
+        Returns:
+            A WebResource object or None if the resource could not be fetched.
+        """
+        await asyncio.sleep(delay)
+        async with semaphore:
+            return await self.fetch_resource(
+                client=client, url=url, ip_address=ip_address
+            )
+
     async def get_resources(
         self, domain: str, paths: Optional[List[str]] = None
     ) -> AsyncIterator[WebResource]:
@@ -337,88 +596,134 @@ class WebResourceCollector:
         # set base URL for client
         base_url = f"{scheme}://{domain}"
 
-        # set up httpx client limits
-        limits = httpx.Limits(
-            max_connections=self.max_connections,
-            max_keepalive_connections=self.max_keepalive,
-        )
-
         # store pages to save content index
         pages = []
 
-        # fetch resources in client context
-        async with httpx.AsyncClient(
-            http1=True,
-            verify=False,
-            limits=limits,
-            timeout=DEFAULT_TIMEOUT_CONFIG,
-            headers={"User-Agent": DEFAULT_USER_AGENT},
-        ) as client:
-            # push tasks to fetch resources
-            LOGGER.info("Fetching resources from %s...", domain)
-
-            # set domain paths
-            domain_paths: list[str] = list(paths)
-
-            # always start with robots.txt
-            robots_resource = await self.fetch_resource(
-                client=client, url=f"{base_url}/robots.txt", ip_address=ip_address
-            )
-            if robots_resource:
-                # parse the robots.txt file
-                robots_parser = urllib.robotparser.RobotFileParser()
-                robots_parser.parse(
-                    robots_resource.content.decode("utf-8").splitlines()
-                )
+        # fetch resources with the shared client
+        client = self._get_client()
 
-                # get the page delay
-                if robots_parser.crawl_delay("*") is not None:
-                    domain_delay = robots_parser.crawl_delay("*")
-                    LOGGER.info("Crawl delay for %s: %f", domain, domain_delay)
-
-                # get the sitemap list
-                site_maps = robots_parser.site_maps()
-                if site_maps:
-                    for sitemap_url in site_maps[:DEFAULT_MAX_SITEMAPS]:
-                        # parse the url
-                        parsed_url = urllib.parse.urlparse(sitemap_url)
-
-                        # check if it's a relative path or absolute path
-                        if parsed_url.scheme and parsed_url.netloc:
-                            domain_paths.append(parsed_url.path)
-                        else:
-                            domain_paths.append(parsed_url.path)
-
-            # fetch the resources
-            tasks = []
-            LOGGER.info("Fetching %d paths from %s...", len(domain_paths), domain)
-            for path in domain_paths:
-                # skip robots.txt since we've already fetched it
-                if path == "/robots.txt":
-                    continue
+        # push tasks to fetch resources
+        LOGGER.info("Fetching resources from %s...", domain)
 
-                # add delay between requests
-                tasks.append(
-                    self.fetch_resource(
-                        client=client, url=f"{base_url}{path}", ip_address=ip_address
-                    )
-                )
+        # set domain paths
+        domain_paths: list[str] = list(paths)
 
-                # avoid reverse DoS via extreme delays like Crawl-Delay: 999999
-                LOGGER.info(
-                    "Delaying %f seconds for %s...",
-                    min(CONFIG.http_delay_max, domain_delay),
-                    domain,
+        # always start with robots.txt
+        robots_resource = await self.fetch_resource(
+            client=client,
+            url=f"{base_url}/robots.txt",
+            ip_address=ip_address,
+        )
+        if robots_resource:
+            # parse the robots.txt file
+            crawl_delay, site_maps = self.parse_robots(robots_resource.content)
+
+            # get the page delay
+            if crawl_delay is not None:
+                domain_delay = crawl_delay
+                LOGGER.info("Crawl delay for %s: %f", domain, domain_delay)
+
+            # get the sitemap list
+            for sitemap_url in site_maps[:DEFAULT_MAX_SITEMAPS]:
+                # keep the path for both relative and absolute sitemap URLs
+                domain_paths.append(urllib.parse.urlparse(sitemap_url).path)
+
+        # avoid reverse DoS via extreme delays like Crawl-Delay: 999999
+        request_delay = min(CONFIG.http_delay_max, domain_delay)
+
+        # schedule each fetch at its own offset so requests are paced by the crawl delay
+        # while the event loop stays free, and cap concurrency to the connection limit
+        semaphore = asyncio.Semaphore(self.max_connections)
+        fetch_paths = [path for path in domain_paths if path != "/robots.txt"]
+        LOGGER.info(
+            "Fetching %d paths from %s with %f seconds between requests...",
+            len(fetch_paths),
+            domain,
+            request_delay,
+        )
+        tasks = [
+            asyncio.create_task(
+                self._delayed_fetch(
+                    client=client,
+                    url=f"{base_url}{path}",
+                    ip_address=ip_address,
+                    delay=index * request_delay,
+                    semaphore=semaphore,
                 )
-                await asyncio.sleep(min(CONFIG.http_delay_max, domain_delay))
+            )
+            for index, path in enumerate(fetch_paths)
+        ]
 
-            # wait for all tasks to complete
+        # yield resources as they complete
+        try:
             for coro in asyncio.as_completed(tasks):
                 web_resource = await coro
                 if web_resource:
                     # add the page to the list
                     yield web_resource
                     pages.append(web_resource)
+        finally:
+            # cancel any pending fetches if the consumer stops early
+            for task in tasks:
+                task.cancel()
 
         # update the domain index
         self.save_domain_content(pages)
+
+    async def crawl_domains(self, domains: Iterable[str]) -> AsyncIterator[WebResource]:
+        """
+        Retrieve resources from many domains concurrently.
+
+        Up to max_domains workers pull domains from the iterable and crawl them with
+        get_resources, which still limits each domain to max_connections requests and its
+        crawl delay.  The iterable is advanced in a worker thread, so a slow generator
+        does not stall the crawls.  Resources are yielded as they arrive from any domain.  Throughput
+        stops improving beyond a few hundred concurrent domains, once DNS and the network
+        become the bottleneck.
+
+        Args:
+            domains: The domains to crawl, which may be a lazy or unbounded iterator.
+
+        Returns:
+            An async iterator of WebResource objects.
+        """
+        domain_iterator = iter(domains)
+        domain_lock = asyncio.Lock()
+        queue: asyncio.Queue[Optional[WebResource]] = asyncio.Queue(
+            maxsize=self.max_domains
+        )
+
+        async def next_domain() -> Optional[str]:
+            # one thread at a time, as generators are not reentrant
+            async with domain_lock:
+                return await asyncio.to_thread(next, domain_iterator, None)
+
+        async def crawl_worker() -> None:
+            try:
+                while (domain := await next_domain()) is not None:
+                    try:
+                        async for web_resource in self.get_resources(domain):
+                            await queue.put(web_resource)
+                    except Exception as e:  # pylint: disable=broad-except
+                        LOGGER.error("Failed to retrieve site %s: %s", domain, e)
+            except Exception as e:  # pylint: disable=broad-except
+                LOGGER.error("Failed to get next domain: %s", e)
+
+            # signal that this worker is finished
+            await queue.put(None)
+
+        workers = [asyncio.create_task(crawl_worker()) for _ in range(self.max_domains)]
+
+        # yield resources until every worker has finished
+        num_finished = 0
+        try:
+            while num_finished < len(workers):
+                web_resource = await queue.get()
+                if web_resource is None:
+                    num_finished += 1
+                    continue
+                yield web_resource
+        finally:
+            # cancel any remaining workers if the consumer stops early
+            for worker in workers:
+                worker.cancel()
@@ -48,7 +48,7 @@ def default_path_list() -> list:
 
 # dataclass for config to load from JSON
 @dataclasses.dataclass
-class WebSurveyConfig:
+class WebSurveyConfig:  # pylint: disable=too-many-instance-attributes
     """
     Configuration class for the WebSurvey package.
     """
@@ -63,6 +63,7 @@ class WebSurveyConfig:
     http_delay: float = 0.1
     http_delay_max: float = 10.0
     http_pool_size: int = 5
+    http_max_domains: int = 100
     http_keep_alive: int = 10
     http_network_timeout: int = 5
     http_connect_timeout: int = 5
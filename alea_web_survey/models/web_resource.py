@@ -10,15 +10,23 @@ from __future__ import annotations
 
 # standard library
 import base64
+import collections
 import datetime
+import functools
 import hashlib
-import json
+import io
 import lzma
+import os
+import re
+import struct
 import urllib.parse
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, BinaryIO, Dict, Optional, Tuple
 
 # packages
+import orjson
+import xxhash
+import zstandard
 from pydantic import BaseModel, Field
 
 # project
@@ -27,6 +35,67 @@ from alea_web_survey.logger import LOGGER
 # set default cache path
 CACHE_PATH = Path().home() / ".alea" / "web-survey" / "cache"
 
+# binary resource container: magic, header length, JSON header, zstd-compressed content
+RESOURCE_MAGIC = b"AWR\x01"
+RESOURCE_PREFIX = struct.Struct("<4sI")
+
+# cache file suffixes for the binary container and the legacy JSON envelope
+RESOURCE_SUFFIX = ".awr"
+LEGACY_RESOURCE_SUFFIX = ".json"
+
+# content codec ids stored in the resource header; headers without one are zstd
+CONTENT_CODEC_ZSTD = "zstd"
+CONTENT_CODEC_XZ = "xz"
+
+# shared zstd contexts, reused across resources
+ZSTD_COMPRESSOR = zstandard.ZstdCompressor(level=10)
+ZSTD_DECOMPRESSOR = zstandard.ZstdDecompressor()
+
+# recently compressed bodies by content digest, so repeated content is compressed once
+COMPRESSED_CONTENT_CACHE: collections.OrderedDict[bytes, bytes] = (
+    collections.OrderedDict()
+)
+DEFAULT_COMPRESSED_CONTENT_CACHE_SIZE = 1024
+DEFAULT_COMPRESSED_CONTENT_MAX_SIZE = 65536
+
+# recently loaded resources by cache file, so hot keys skip the disk and decompression
+LOADED_RESOURCE_CACHE: collections.OrderedDict[Path, WebResource] = (
+    collections.OrderedDict()
+)
+DEFAULT_LOADED_RESOURCE_CACHE_SIZE = 1024
+DEFAULT_LOADED_RESOURCE_MAX_SIZE = 65536
+
+# cache path constants
+DEFAULT_CACHE_PATH_CACHE_SIZE = 65536
+URL_SPLIT_RE = re.compile(r"([^/?#]*)([^?#]*)")
+URL_UNSAFE_RE = re.compile(r"^[\x00-\x20]|[\t\r\n]")
+
+
+def split_url(url: str) -> Tuple[str, str]:
+    """
+    Split an absolute URL into its network location and path.
+
+    This gives the same netloc and path as urllib.parse.urlparse, falling back to it for
+    URLs without a "scheme://" prefix or with characters it would strip.
+
+    :param url: The URL to split.
+    :return: The network location and path.
+    """
+    scheme, separator, rest = url.partition("://")
+    if not separator or not scheme.isalnum() or URL_UNSAFE_RE.search(url):
+        parsed_url = urllib.parse.urlparse(url)
+        return parsed_url.netloc, parsed_url.path
+
+    # the netloc ends at the first "/", "?" or "#", and the path at "?" or "#"
+    netloc, path = URL_SPLIT_RE.match(rest).groups()  # type: ignore[union-attr]
+
+    # drop ";params" from the last path segment, like urlparse
+    params_start = path.find(";", path.rfind("/"))
+    if params_start >= 0:
+        path = path[:params_start]
+
+    return netloc, path
+
 
 def utc_now() -> datetime.datetime:
     """
@@ -56,6 +125,85 @@ class WebResource(BaseModel):
     date_retrieved: datetime.datetime = Field(default_factory=utc_now)
     date_modified: Optional[datetime.datetime] = None
 
+    @classmethod
+    def from_stream(cls, stream: BinaryIO) -> WebResource:
+        """
+        Load a web resource from a binary stream.
+
+        Only the prefix and header are read up front; the content is decompressed straight
+        from the stream. Files written in the legacy lzma+base64 JSON format are still
+        accepted.
+
+        :param stream: The stream positioned at the start of the serialized resource.
+        :return: The loaded web resource.
+        """
+        # read the legacy JSON envelope
+        prefix = stream.read(RESOURCE_PREFIX.size)
+        if not prefix.startswith(RESOURCE_MAGIC):
+            file_data = orjson.loads(prefix + stream.read())
+            content = cls.decompress_content(
+                io.BytesIO(base64.b64decode(file_data["content"])), CONTENT_CODEC_XZ
+            )
+            return cls.from_header(file_data, content)
+
+        # read the header, then decompress the content that follows it
+        _, header_length = RESOURCE_PREFIX.unpack(prefix)
+        file_data = orjson.loads(stream.read(header_length))
+        content = cls.decompress_content(
+            stream, file_data.get("codec", CONTENT_CODEC_ZSTD)
+        )
+        return cls.from_header(file_data, content)
+
+    @staticmethod
+    def decompress_content(stream: BinaryIO, codec: str) -> bytes:
+        """
+        Decompress the content that follows the header.
+
+        :param stream: The stream positioned at the start of the content.
+        :param codec: The codec id stored in the header.
+        :return: The decompressed content.
+        """
+        if codec == CONTENT_CODEC_ZSTD:
+            with ZSTD_DECOMPRESSOR.stream_reader(stream, closefd=False) as reader:
+                return reader.read()
+        if codec == CONTENT_CODEC_XZ:
+            return lzma.decompress(stream.read())
+        raise ValueError(f"Unsupported content codec: {codec}")
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> WebResource:
+        """
+        Load a web resource from its serialized form.
+
+        :param data: The serialized web resource.
+        :return: The loaded web resource.
+        """
+        return cls.from_stream(io.BytesIO(data))
+
+    @classmethod
+    def from_header(cls, file_data: Dict[str, Any], content: bytes) -> WebResource:
+        """
+        Create a web resource from its header fields and decompressed content.
+
+        :param file_data: The header fields.
+        :param content: The decompressed content.
+        :return: The web resource.
+        """
+        return cls(
+            url=file_data["url"],
+            ip=file_data["ip"],
+            status=file_data["status"],
+            hash=file_data["hash"],
+            size=file_data["size"],
+            content=content,
+            content_type=file_data["content_type"],
+            headers=file_data["headers"],
+            date_retrieved=datetime.datetime.fromisoformat(file_data["date_retrieved"]),
+            date_modified=datetime.datetime.fromisoformat(file_data["date_modified"])
+            if file_data["date_modified"]
+            else None,
+        )
+
     @classmethod
     def from_file(cls, path: Path) -> WebResource:
         """
@@ -65,79 +213,121 @@ class WebResource(BaseModel):
         :return: The loaded web resource.
         """
         with path.open("rb") as input_file:
-            # load raw data
-            file_data = json.load(input_file)
-
-            # decode base64-encoded content
-            content = base64.b64decode(file_data["content"])
-
-            # decompress content
-            content = lzma.decompress(content)
-
-            # create web resource
-            return cls(
-                url=file_data["url"],
-                ip=file_data["ip"],
-                status=file_data["status"],
-                hash=file_data["hash"],
-                size=file_data["size"],
-                content=content,
-                content_type=file_data["content_type"],
-                headers=file_data["headers"],
-                date_retrieved=datetime.datetime.fromisoformat(
-                    file_data["date_retrieved"]
-                ),
-                date_modified=datetime.datetime.fromisoformat(
-                    file_data["date_modified"]
-                )
-                if file_data["date_modified"]
-                else None,
-            )
+            return cls.from_stream(input_file)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize a web resource to a JSON header followed by zstd-compressed content.
+
+        :return: The serialized web resource.
+        """
+        return b"".join(self.to_parts())
+
+    def to_parts(self) -> Tuple[bytes, bytes, bytes]:
+        """
+        Serialize a web resource into its prefix, JSON header, and compressed content.
+
+        The parts can be written one after another without joining them into one buffer.
+
+        :return: The prefix, header, and zstd-compressed content.
+        """
+        # create header data
+        header = orjson.dumps(
+            {
+                "url": self.url,
+                "ip": self.ip,
+                "status": self.status,
+                "hash": self.hash,
+                "size": self.size,
+                "codec": CONTENT_CODEC_ZSTD,
+                "content_type": self.content_type,
+                "headers": self.headers,
+                "date_retrieved": self.date_retrieved,
+                "date_modified": self.date_modified,
+            }
+        )
+
+        return (
+            RESOURCE_PREFIX.pack(RESOURCE_MAGIC, len(header)),
+            header,
+            self.compress_content(),
+        )
+
+    def compress_content(self) -> bytes:
+        """
+        Compress the content, reusing the frame of a recently saved identical body.
+
+        :return: The zstd frame of the content.
+        """
+        # look up the body by a digest of its bytes, e.g. a boilerplate robots.txt
+        content_key = xxhash.xxh3_128_digest(self.content)
+        compressed_content = COMPRESSED_CONTENT_CACHE.get(content_key)
+        if compressed_content is not None:
+            COMPRESSED_CONTENT_CACHE.move_to_end(content_key)
+            return compressed_content
+
+        # compress and remember small bodies, evicting the least recently used
+        compressed_content = ZSTD_COMPRESSOR.compress(self.content)
+        if len(compressed_content) <= DEFAULT_COMPRESSED_CONTENT_MAX_SIZE:
+            COMPRESSED_CONTENT_CACHE[content_key] = compressed_content
+            if len(COMPRESSED_CONTENT_CACHE) > DEFAULT_COMPRESSED_CONTENT_CACHE_SIZE:
+                COMPRESSED_CONTENT_CACHE.popitem(last=False)
+        return compressed_content
+
+    @staticmethod
+    def header_from_file(path: Path) -> Optional[Dict[str, Any]]:
+        """
+        Read only the header fields of a saved web resource.
+
+        :param path: The path to the file to read.
+        :return: The header fields, or None if the file is missing or in the legacy format.
+        """
+        try:
+            with path.open("rb") as input_file:
+                prefix = input_file.read(RESOURCE_PREFIX.size)
+                if not prefix.startswith(RESOURCE_MAGIC):
+                    return None
+                _, header_length = RESOURCE_PREFIX.unpack(prefix)
+                return orjson.loads(input_file.read(header_length))
+        except (OSError, struct.error, orjson.JSONDecodeError):
+            return None
 
     def save(self, path: Path) -> None:
         """
         Save a web resource to a file on disk.
 
+        The write is skipped if the file already holds content with the same hash.
+
         :param path: The path to the file to save.
         """
+        # skip unchanged content
+        existing_header = self.header_from_file(path)
+        if existing_header is not None and existing_header["hash"] == self.hash:
+            LOGGER.debug("Content unchanged for %s at %s", self.url, path)
+            return
+
+        # drop any stale copy of the file from the loaded resource cache
+        LOADED_RESOURCE_CACHE.pop(path, None)
+
         # create directory if it doesn't exist
         path.parent.mkdir(parents=True, exist_ok=True)
 
-        # compress content
-        content = lzma.compress(self.content)
-
-        # encode content as base64
-        content = base64.b64encode(content)
-
-        # create file data
-        # pylint: disable=no-member
-        file_data = {
-            "url": self.url,
-            "ip": self.ip,
-            "status": self.status,
-            "hash": self.hash,
-            "size": self.size,
-            "content": content.decode("utf-8"),
-            "content_type": self.content_type,
-            "headers": self.headers,
-            "date_retrieved": self.date_retrieved.isoformat(),
-            "date_modified": self.date_modified.isoformat()
-            if self.date_modified
-            else None,
-        }
-
-        # write file data
-        with path.open("wt", encoding="utf-8") as output_file:
-            output_file.write(json.dumps(file_data))
+        # write file data part by part, without copying the content into one buffer
+        with path.open("wb") as output_file:
+            output_file.writelines(self.to_parts())
 
     @staticmethod
-    def get_cache_path(url: str, cache_path: Optional[Path] = None) -> Path:
+    @functools.lru_cache(maxsize=DEFAULT_CACHE_PATH_CACHE_SIZE)
+    def get_cache_path(
+        url: str, cache_path: Optional[Path] = None, legacy: bool = False
+    ) -> Path:
         """
         Get the cache path based on the URL.
 
         Args:
             url (str): url for WebResource
             cache_path (Path): base path for fs storage
+            legacy (bool): use the BLAKE2b .json file name written by earlier versions
 
         Returns:
              Path to cached object if it exists.
@@ -145,18 +335,19 @@ class WebResource(BaseModel):
         if cache_path is None:
             cache_path = CACHE_PATH
 
-        # Parse the URL components
-        parsed_url = urllib.parse.urlparse(url)
+        # Split the URL into domain and path
+        domain, path = split_url(url)
 
-        # Extract domain and safely encode it
-        domain = parsed_url.netloc
-
-        # Extract path and safely encode it
-        path = parsed_url.path
-        path_hash = hashlib.blake2b(path.encode("utf-8")).hexdigest()
+        # Hash the path into the file name
+        if legacy:
+            path_hash = hashlib.blake2b(path.encode("utf-8")).hexdigest()
+            suffix = LEGACY_RESOURCE_SUFFIX
+        else:
+            path_hash = xxhash.xxh3_64_hexdigest(path.encode("utf-8"))
+            suffix = RESOURCE_SUFFIX
 
         # Set the full cache directory and file path
-        return cache_path / domain / f"{path_hash}.json"
+        return Path(os.path.join(cache_path, domain, f"{path_hash}{suffix}"))
 
     def save_to_cache(self, cache_path: Optional[Path] = None):
         """
@@ -184,13 +375,24 @@ class WebResource(BaseModel):
         :param cache_path: Base path to load the cache from (optional).
         :return: The loaded web resource, or None if not found.
         """
-        # get cache path
-        cache_file = cls.get_cache_path(url, cache_path)
-
-        # Check if the cache file exists
-        if not cache_file.exists():
-            LOGGER.debug("Cache file not found for URL %s at %s", url, cache_file)
-            return None
-
-        # return if it does
-        return cls.from_file(cache_file)
+        # check the current cache path, then the legacy one
+        for legacy in (False, True):
+            cache_file = cls.get_cache_path(url, cache_path, legacy=legacy)
+
+            # serve recently loaded resources from memory; callers get their own copy
+            resource = LOADED_RESOURCE_CACHE.get(cache_file)
+            if resource is not None:
+                LOADED_RESOURCE_CACHE.move_to_end(cache_file)
+                return resource.model_copy(deep=True)
+
+            if cache_file.exists():
+                # load and remember small resources, evicting the least recently used
+                resource = cls.from_file(cache_file)
+                if len(resource.content) <= DEFAULT_LOADED_RESOURCE_MAX_SIZE:
+                    LOADED_RESOURCE_CACHE[cache_file] = resource.model_copy(deep=True)
+                    if len(LOADED_RESOURCE_CACHE) > DEFAULT_LOADED_RESOURCE_CACHE_SIZE:
+                        LOADED_RESOURCE_CACHE.popitem(last=False)
+                return resource
+
+        LOGGER.debug("Cache file not found for URL %s", url)
+        return None
@@ -6,11 +6,15 @@ S3 storage utilities for the web-survey collector.
 import concurrent.futures
 import logging
 import multiprocessing
+import os
+import tarfile
+import tempfile
 from pathlib import Path
 from typing import Any, Generator, Tuple
 
 # packages
 import boto3
+import boto3.s3.transfer
 import botocore.config
 
 # project
@@ -31,6 +35,7 @@ LOGGER = logging.getLogger(__name__)
 # path constants
 DEFAULT_CACHE_PATH = Path().home() / ".alea" / "web-survey" / "cache"
 DEFAULT_S3_BUCKET = CONFIG.s3_bucket
+DEFAULT_DOMAIN_ARCHIVE_SUFFIX = ".tar"
 
 # s3 constants
 DEFAULT_S3_THREADS = multiprocessing.cpu_count()
@@ -38,6 +43,7 @@ DEFAULT_S3_POOL_SIZE = DEFAULT_S3_THREADS
 DEFAULT_S3_CONNECT_TIMEOUT = 30
 DEFAULT_S3_READ_TIMEOUT = 30
 DEFAULT_S3_MAX_RETRIES = 10
+DEFAULT_S3_UPLOAD_THRESHOLD = 8 * 1024 * 1024
 
 
 # s3 config
@@ -54,63 +60,92 @@ BOTO_S3_CONFIG = botocore.config.Config(
 # create shared client
 S3_CLIENT = boto3.client("s3", config=BOTO_S3_CONFIG)
 
+# large uploads run on the calling thread, which already belongs to the S3 thread pool
+S3_TRANSFER_CONFIG = boto3.s3.transfer.TransferConfig(
+    multipart_threshold=DEFAULT_S3_UPLOAD_THRESHOLD,
+    use_threads=False,
+)
+
 # create an S3 thread pool
 S3_THREAD_POOL = concurrent.futures.ThreadPoolExecutor(DEFAULT_S3_THREADS)
 
 
-def copy_object(
-    source_path: Path,
+def get_domain_archive_key(domain: str) -> str:
+    """
+    Get the S3 key of the archive holding all cached files for a domain.
+
+    Args:
+        domain (str): Domain name, as used for the cache directory
+
+    Returns:
+        str: S3 key of the domain archive
+    """
+    return f"{domain}{DEFAULT_DOMAIN_ARCHIVE_SUFFIX}"
+
+
+def copy_domain_archive(
+    source_paths: Tuple[Path, ...],
     s3_client: Any,
     dest_bucket: str,
     dest_key: str,
     remove_after: bool = False,
 ) -> None:
     """
-    Copy a local object to an S3 bucket.
+    Copy a domain's local objects to an S3 bucket as a single tar archive.
+
+    The cached files are already compressed, so the archive is a plain tar whose members
+    are named after the files. Archives larger than the upload threshold are spooled to
+    disk and streamed to S3 through the transfer manager.
 
     Args:
-        source_path (Path): Path to the local object
+        source_paths (Tuple[Path, ...]): Paths to the domain's local objects
         s3_client (Any): S3 client
         dest_bucket (str): Destination S3 bucket
         dest_key (str): Destination S3 key
-        remove_after (bool): Whether to remove the local object after copying
+        remove_after (bool): Whether to remove the local objects after copying
 
     Returns:
         None
     """
     try:
-        # get object into memory
-        source_data = source_path.read_bytes()
-
-        # put object into new bucket
-        s3_client.put_object(
-            Bucket=dest_bucket,
-            Key=dest_key,
-            Body=source_data,
-        )
+        # build the archive in memory, spilling to disk once it passes the upload threshold
+        with tempfile.SpooledTemporaryFile(
+            max_size=DEFAULT_S3_UPLOAD_THRESHOLD
+        ) as archive_buffer:
+            with tarfile.open(fileobj=archive_buffer, mode="w") as archive:
+                for source_path in source_paths:
+                    archive.add(source_path, arcname=source_path.name)
+
+            # stream archive into new bucket
+            archive_buffer.seek(0)
+            s3_client.upload_fileobj(
+                archive_buffer,
+                dest_bucket,
+                dest_key,
+                Config=S3_TRANSFER_CONFIG,
+            )
 
-        # remove local object if requested
+        # remove local objects if requested
         if remove_after:
+            for source_path in source_paths:
+                source_path.unlink()
             LOGGER.info(
-                "Successfully copy-deleted %s to %s/%s",
-                source_path,
+                "Successfully archive-deleted %d objects to %s/%s",
+                len(source_paths),
                 dest_bucket,
                 dest_key,
             )
-            source_path.unlink()
         else:
             LOGGER.info(
-                "Successfully copied %s to %s/%s",
-                source_path,
+                "Successfully archived %d objects to %s/%s",
+                len(source_paths),
                 dest_bucket,
                 dest_key,
             )
 
     except Exception as e:
         # log failure
-        LOGGER.error(
-            "Failed to copy %s to %s/%s: %s", source_path, dest_bucket, dest_key, e
-        )
+        LOGGER.error("Failed to archive objects to %s/%s: %s", dest_bucket, dest_key, e)
         raise e
 
 
@@ -122,8 +157,13 @@ def get_completed_paths() -> Generator[Tuple[Path, ...], None, None]:
     Returns:
         Generator[Tuple[Path, ...], None, None]: Generator of paths within each completed directory.
     """
-    # iterate through the data directory
-    for domain_path in DEFAULT_CACHE_PATH.iterdir():
-        # check if /content.json exists
-        if (domain_path / "content.json").exists():
-            yield tuple(domain_path.iterdir())
+    # iterate through the data directory; scandir reports entry types without a stat
+    with os.scandir(DEFAULT_CACHE_PATH) as domain_entries:
+        for domain_entry in domain_entries:
+            if not domain_entry.is_dir(follow_symlinks=False):
+                continue
+
+            # check if /content.json exists, then list the domain's files
+            if os.path.lexists(os.path.join(domain_entry.path, "content.json")):
+                with os.scandir(domain_entry.path) as path_entries:
+                    yield tuple(Path(path_entry.path) for path_entry in path_entries)
@@ -4,7 +4,8 @@ Web data collection task.
 
 # imports
 import logging
-from typing import Optional
+import time
+from typing import Iterator, Optional
 
 # packages
 import tqdm
@@ -16,6 +17,12 @@ from alea_web_survey.collection.http.web_client import WebResourceCollector
 # set up logging
 LOGGER = logging.getLogger(__name__)
 
+# minimum seconds between progress bar postfix refreshes
+DEFAULT_POSTFIX_INTERVAL = 0.2
+
+# size units in powers of 1024
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB", "EB", "ZB", "YB")
+
 
 def size_to_str(num_bytes: int) -> str:
     """
@@ -27,31 +34,28 @@ def size_to_str(num_bytes: int) -> str:
     Returns:
         The string.
     """
-    # convert to float
-    byte_result = float(num_bytes)
-
-    # iterate through units in order of magnitude
-    for unit in ["B", "KB", "MB", "GB", "TB", "PB", "EB", "ZB"]:
-        if abs(byte_result) < 1024.0:
-            return f"{byte_result:3.1f} {unit}"
-        byte_result /= 1024.0
-    return f"{byte_result:.1f} YB"
+    # pick the unit from the bit length, then scale with a single division
+    unit_index = min(max(abs(num_bytes).bit_length() - 1, 0) // 10, len(SIZE_UNITS) - 1)
+    byte_result = num_bytes / (1 << (unit_index * 10))
+    return f"{byte_result:3.1f} {SIZE_UNITS[unit_index]}"
 
 
 async def collect_sites(max_sites: Optional[int] = None) -> bool:
     """
     Retrieve a number of websites and save them to the filesystem.
 
+    Domains are crawled concurrently, up to the collector's max_domains at a time.
+
     Args:
         max_sites: The max number of sites to retrieve.
 
     Returns:
         True if successful, False otherwise
     """
-    try:
-        # create the web resource collector
-        web_collector = WebResourceCollector()
+    # create the web resource collector
+    web_collector = WebResourceCollector()
 
+    try:
         # create the domain generator
         domain_generator = DomainGenerator()
 
@@ -60,45 +64,64 @@ async def collect_sites(max_sites: Optional[int] = None) -> bool:
         num_pages = 0
         num_bytes = 0
         prog_bar = tqdm.tqdm(total=max_sites, desc="Retrieving sites...")
-        while True:
-            try:
-                # stop when requested
-                if max_sites is not None and num_sites >= max_sites:
-                    break
-
-                # get a domain
-                domain = domain_generator.generate().rstrip(".")
-                if domain is None:
+        last_postfix_time = 0.0
+
+        def generate_domains() -> Iterator[str]:
+            """
+            Generate domains until max_sites have been dispatched.
+
+            Yields:
+                The next domain to crawl.
+            """
+            nonlocal num_sites
+            while max_sites is None or num_sites < max_sites:
+                try:
+                    # get a domain
+                    domain = domain_generator.generate().rstrip(".")
+                except ValueError as e:
+                    # no usable generation methods, so no domain will ever come
+                    LOGGER.error("Failed to generate domains: %s", e)
+                    return
+                except Exception as e:  # pylint: disable=broad-except
+                    LOGGER.error("Failed to generate domain: %s", e)
+                    continue
+                if not domain:
                     continue
 
-                # set status
+                # increment the count
+                num_sites += 1
+                prog_bar.update(1)
+                yield domain
+
+        # crawl domains concurrently and track pages as they arrive
+        async for page in web_collector.crawl_domains(generate_domains()):
+            # increment the count
+            num_pages += 1
+            num_bytes += page.size
+
+            # refresh the postfix at most once per interval
+            now = time.monotonic()
+            if now - last_postfix_time >= DEFAULT_POSTFIX_INTERVAL:
+                last_postfix_time = now
                 prog_bar.set_postfix(
-                    domain=domain,
+                    url=page.url,
                     num_sites=num_sites,
                     num_pages=num_pages,
                     num_bytes=size_to_str(num_bytes),
                 )
 
-                # get the web resource
-                async for page in web_collector.get_resources(domain):
-                    # increment the count
-                    num_pages += 1
-                    num_bytes += page.size
-                    prog_bar.set_postfix(
-                        domain=domain,
-                        num_sites=num_sites,
-                        num_pages=num_pages,
-                        num_bytes=size_to_str(num_bytes),
-                    )
-
-                # increment the count
-                num_sites += 1
-                prog_bar.update(1)
-            except Exception as e:  # pylint: disable=broad-except
-                LOGGER.error("Failed to retrieve site: %s", e)
-                continue
+        # show the final totals
+        prog_bar.set_postfix(
+            num_sites=num_sites,
+            num_pages=num_pages,
+            num_bytes=size_to_str(num_bytes),
+        )
         prog_bar.close()
         return True
     except Exception as e:  # pylint: disable=broad-except
         LOGGER.error("Failed to collect sites: %s", e)
         return False
+    finally:
+        # close the shared client and browser
+        await web_collector.aclose()
+        await WebResourceCollector.close_browser()
@@ -1,32 +1,77 @@
 """
-Web data collection task with parallel processing using semaphore and concurrent.futures.
+Web data collection task with parallel processing using worker processes.
 """
 
 import asyncio
 import logging
-from typing import Optional, Tuple
+import multiprocessing.util
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Set, Tuple
 
 import tqdm
 
 from alea_web_survey.collection.dns.domain_generator import DomainGenerator
 from alea_web_survey.collection.http.web_client import WebResourceCollector
-from alea_web_survey.tasks.collect_web import size_to_str
+from alea_web_survey.tasks.collect_web import DEFAULT_POSTFIX_INTERVAL, size_to_str
 
 LOGGER = logging.getLogger(__name__)
 
+# domain generator for the current worker process, set by init_domain_generator
+WORKER_DOMAIN_GENERATOR: Optional[DomainGenerator] = None
 
-async def collect_domain(domain: str) -> Tuple[int, int, int]:
+# event loop and collector for the current worker process, set by init_collect_worker
+WORKER_EVENT_LOOP: Optional[asyncio.AbstractEventLoop] = None
+WORKER_COLLECTOR: Optional[WebResourceCollector] = None
+
+
+def init_domain_generator() -> None:
+    """
+    Load a domain generator once per worker process.
+
+    Returns:
+        None
+    """
+    global WORKER_DOMAIN_GENERATOR  # pylint: disable=global-statement
+    WORKER_DOMAIN_GENERATOR = DomainGenerator()
+
+
+def generate_domain_batch(num_domains: int) -> List[str]:
+    """
+    Generate a batch of domains in a worker process.
+
+    Args:
+        num_domains: The number of domains to generate.
+
+    Returns:
+        The list of generated domains.
+    """
+    if WORKER_DOMAIN_GENERATOR is None:
+        init_domain_generator()
+    return [
+        WORKER_DOMAIN_GENERATOR.generate().rstrip(".")  # type: ignore[union-attr]
+        for _ in range(num_domains)
+    ]
+
+
+async def collect_domain(
+    domain: str, web_collector: Optional[WebResourceCollector] = None
+) -> Tuple[int, int, int]:
     """
     Collect resources for a single domain.
 
     Args:
         domain: The domain to collect resources from.
+        web_collector: Optional shared collector; a temporary one is created and closed
+            if not provided.
 
     Returns:
         A tuple of (number of pages, number of bytes, 1 if successful else 0).
     """
-    # create a new web resource collector locally
-    web_collector = WebResourceCollector()
+    # create a new web resource collector locally if none is shared
+    local_collector = web_collector is None
+    if web_collector is None:
+        web_collector = WebResourceCollector()
 
     num_pages = 0
     num_bytes = 0
@@ -38,6 +83,51 @@ async def collect_domain(domain: str) -> Tuple[int, int, int]:
     except Exception as e:  # pylint: disable=broad-except
         LOGGER.error("Failed to retrieve site %s: %s", domain, e)
         return 0, 0, 0
+    finally:
+        # close the collector's client if it was created here
+        if local_collector:
+            await web_collector.aclose()
+
+
+def init_collect_worker() -> None:
+    """
+    Create a persistent event loop and collector for a collection worker process.
+
+    The loop outlives each domain, so the collector's host and resource caches and the
+    shared browser stay bound to a running loop, and the collector's HTTP client keeps
+    its connection pool and SSL context across domains. The client and browser are closed
+    and the loop shut down when the worker process exits.
+
+    Returns:
+        None
+    """
+    global WORKER_EVENT_LOOP, WORKER_COLLECTOR  # pylint: disable=global-statement
+    WORKER_EVENT_LOOP = asyncio.new_event_loop()
+    asyncio.set_event_loop(WORKER_EVENT_LOOP)
+
+    # each worker process collects one domain at a time
+    WORKER_COLLECTOR = WebResourceCollector(max_domains=1)
+    multiprocessing.util.Finalize(None, close_collect_worker, exitpriority=10)
+
+
+def close_collect_worker() -> None:
+    """
+    Shut down the shared client, browser and event loop of a collection worker process.
+
+    Returns:
+        None
+    """
+    if WORKER_EVENT_LOOP is None:
+        return
+
+    try:
+        if WORKER_COLLECTOR is not None:
+            WORKER_EVENT_LOOP.run_until_complete(WORKER_COLLECTOR.aclose())
+        WORKER_EVENT_LOOP.run_until_complete(WebResourceCollector.close_browser())
+    except Exception as e:  # pylint: disable=broad-except
+        LOGGER.error("Failed to close worker collector: %s", e)
+    finally:
+        WORKER_EVENT_LOOP.close()
 
 
 def collect_domain_sync(domain: str) -> Tuple[int, int, int]:
@@ -50,6 +140,11 @@ def collect_domain_sync(domain: str) -> Tuple[int, int, int]:
     Returns:
         A tuple of (number of pages, number of bytes, 1 if successful else 0).
     """
+    # reuse the worker's event loop when running in a collection worker process
+    if WORKER_EVENT_LOOP is not None:
+        return WORKER_EVENT_LOOP.run_until_complete(
+            collect_domain(domain, web_collector=WORKER_COLLECTOR)
+        )
     return asyncio.run(collect_domain(domain))
 
 
@@ -61,13 +156,20 @@ async def collect_sites_parallel(
 
     Args:
         max_sites: The max number of sites to retrieve.
-        max_workers: The maximum number of worker threads.
+        max_workers: The maximum number of worker processes.
 
     Returns:
         True if successful, False otherwise
     """
+    # generate domains in a separate process and collect them in a pool of processes
+    domain_executor = ProcessPoolExecutor(
+        max_workers=1, initializer=init_domain_generator
+    )
+    collect_executor = ProcessPoolExecutor(
+        max_workers=max_workers, initializer=init_collect_worker
+    )
     try:
-        domain_generator = DomainGenerator()
+        loop = asyncio.get_running_loop()
 
         # if max_sites is None, set it to 1M
         max_sites = max_sites or 1_000_000
@@ -75,41 +177,64 @@ async def collect_sites_parallel(
 
         # create the progress bar
         prog_bar = tqdm.tqdm(total=max_sites, desc="Retrieving sites...")
-
-        while True:
-            # stop when requested
-            if num_sites >= max_sites:
-                break
-
-            # get a batch of domains
-            domains_to_process = [
-                domain_generator.generate().rstrip(".") for _ in range(max_workers * 4)
-            ]
-
-            # create the semaphore
-            semaphore = asyncio.Semaphore(max_workers)
-
-            # create the tasks
-            tasks = [
-                asyncio.ensure_future(collect_domain(domain))
-                for domain in domains_to_process
-            ]
-
-            # run the tasks
-            for task in tasks:
-                async with semaphore:
-                    await task
-                    num_pages, num_bytes, success = task.result()
-                    if success:
-                        num_sites += 1
-                        prog_bar.update(1)
+        last_postfix_time = 0.0
+
+        # bounded queue of generated domains waiting for a worker
+        domain_queue: asyncio.Queue[str] = asyncio.Queue(maxsize=max_workers * 2)
+
+        async def produce_domains() -> None:
+            """
+            Keep the domain queue topped up with generated domains.
+            """
+            while True:
+                for domain in await loop.run_in_executor(
+                    domain_executor, generate_domain_batch, max_workers
+                ):
+                    await domain_queue.put(domain)
+
+        async def collect_worker() -> None:
+            """
+            Collect queued domains until enough sites have been retrieved.
+            """
+            nonlocal num_sites, last_postfix_time
+            while num_sites < max_sites:
+                domain = await domain_queue.get()
+                num_pages, num_bytes, success = await loop.run_in_executor(
+                    collect_executor, collect_domain_sync, domain
+                )
+                if success:
+                    num_sites += 1
+                    prog_bar.update(1)
+
+                    # refresh the postfix at most once per interval
+                    now = time.monotonic()
+                    if now - last_postfix_time >= DEFAULT_POSTFIX_INTERVAL:
+                        last_postfix_time = now
                         prog_bar.set_postfix(
                             num_sites=num_sites,
                             num_pages=num_pages,
                             num_bytes=size_to_str(num_bytes),
                         )
 
+        # run the producer alongside one worker per collection process
+        producer = asyncio.create_task(produce_domains())
+        workers = asyncio.gather(*(collect_worker() for _ in range(max_workers)))
+        watched: Set[asyncio.Future] = {producer, workers}
+        try:
+            # the producer only stops by failing, which would leave the workers waiting
+            await asyncio.wait(watched, return_when=asyncio.FIRST_COMPLETED)
+            if producer.done():
+                producer.result()
+            await workers
+        finally:
+            producer.cancel()
+            workers.cancel()
+
         return True
     except Exception as e:  # pylint: disable=broad-except
         LOGGER.error("Failed to retrieve sites: %s", e)
         return False
+    finally:
+        # stop the worker processes; each collection worker closes its own browser
+        domain_executor.shutdown(wait=False, cancel_futures=True)
+        collect_executor.shutdown(wait=True, cancel_futures=True)
@@ -3,17 +3,103 @@ Output a resource, either by checking the local cache or fetching it from S3.
 """
 
 # imports
-import base64
-import io
-import json
-import lzma
-
-from alea_web_survey.models.web_resource import WebResource
-from alea_web_survey.storage.s3 import DEFAULT_CACHE_PATH, DEFAULT_S3_BUCKET, S3_CLIENT
+import functools
+import tarfile
+from pathlib import Path
+from typing import Dict, Optional
 
 # packages
+import botocore.exceptions
+import botocore.response
 
 # project
+from alea_web_survey.models.web_resource import WebResource
+from alea_web_survey.storage.s3 import (
+    DEFAULT_CACHE_PATH,
+    DEFAULT_S3_BUCKET,
+    S3_CLIENT,
+    get_domain_archive_key,
+)
+
+# number of downloaded domain archives to keep in memory
+DEFAULT_ARCHIVE_CACHE_SIZE = 64
+
+
+def open_object(s3_key: str) -> Optional[botocore.response.StreamingBody]:
+    """
+    Open a streaming read of an object in S3.
+
+    Args:
+        s3_key (str): The S3 key of the object.
+
+    Returns:
+        Optional[botocore.response.StreamingBody]: The object body, or None if the key
+            does not exist.
+    """
+    # use boto3 client to stream the object from S3
+    try:
+        response = S3_CLIENT.get_object(Bucket=DEFAULT_S3_BUCKET, Key=s3_key)
+    except botocore.exceptions.ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+            return None
+        raise
+
+    return response["Body"]
+
+
+@functools.lru_cache(maxsize=DEFAULT_ARCHIVE_CACHE_SIZE)
+def load_domain_archive(domain: str) -> Dict[str, bytes]:
+    """
+    Download a domain archive from S3 and index its members by file name.
+
+    Archives are cached, so resources from the same domain are served from one download.
+
+    Args:
+        domain (str): The domain name.
+
+    Returns:
+        Dict[str, bytes]: The archive members by file name, or an empty dict if the
+            domain has no archive.
+    """
+    archive_body = open_object(get_domain_archive_key(domain))
+    if archive_body is None:
+        return {}
+
+    # read each member into memory as the archive streams in
+    members = {}
+    with archive_body, tarfile.open(fileobj=archive_body, mode="r|") as archive:
+        for member in archive:
+            member_file = archive.extractfile(member)
+            if member_file is not None:
+                members[member.name] = member_file.read()
+    return members
+
+
+def download_resource(resource_path: Path) -> Optional[WebResource]:
+    """
+    Download a resource from S3, from its domain archive or from its own object.
+
+    Args:
+        resource_path (Path): The local cache path of the resource.
+
+    Returns:
+        Optional[WebResource]: The resource, or None if it is not in S3.
+    """
+    # check the domain archive first
+    archive_members = load_domain_archive(resource_path.parent.name)
+    if resource_path.name in archive_members:
+        return WebResource.from_bytes(archive_members[resource_path.name])
+
+    # the s3 key is the relative portion of the file path after the cache path
+    resource_body = open_object(
+        resource_path.relative_to(DEFAULT_CACHE_PATH).as_posix()
+    )
+    if resource_body is None:
+        return None
+
+    # decompress the resource as it streams in
+    with resource_body:
+        return WebResource.from_stream(resource_body)
 
 
 def get_resource(url: str) -> bytes:
@@ -26,24 +112,18 @@ def get_resource(url: str) -> bytes:
     Returns:
         bytes: The content of the resource.
     """
-    resource_path = WebResource.get_cache_path(url)
-    if resource_path.exists():
-        # load the resource from the cache
-        resource_data = json.loads(resource_path.read_text())
-    else:
-        # the s3 key is the relative portion of the file path after the cache path
-        s3_key = resource_path.relative_to(DEFAULT_CACHE_PATH).as_posix()
-
-        # use boto3 client to fetch the resource from S3
-        resource_buffer = io.BytesIO()
-        S3_CLIENT.download_fileobj(
-            Bucket=DEFAULT_S3_BUCKET,
-            Key=s3_key,
-            Fileobj=resource_buffer,
+    # load the resource from the local cache if it exists
+    resource = WebResource.load_from_cache(url, DEFAULT_CACHE_PATH)
+
+    # try the current file name first, then the one written by earlier versions
+    for legacy in (False, True):
+        if resource is not None:
+            break
+        resource = download_resource(
+            WebResource.get_cache_path(url, DEFAULT_CACHE_PATH, legacy)
         )
 
-        # decompress the resource
-        resource_buffer.seek(0)
-        resource_data = json.loads(resource_buffer.read())
+    if resource is None:
+        raise FileNotFoundError(f"Resource not found in cache or S3: {url}")
 
-    return lzma.decompress(base64.b64decode(resource_data["content"]))
+    return resource.content
@@ -3,18 +3,22 @@ This module contains the push_cache function, which is responsible for pushing c
 """
 
 # imports
+import concurrent.futures
 import logging
+from typing import Set
 
 # packages
 import tqdm
 
 # project
 from alea_web_survey.storage.s3 import (
-    DEFAULT_CACHE_PATH,
     DEFAULT_S3_BUCKET,
+    DEFAULT_S3_POOL_SIZE,
     S3_CLIENT,
-    copy_object,
+    S3_THREAD_POOL,
+    copy_domain_archive,
     get_completed_paths,
+    get_domain_archive_key,
 )
 
 # logger set up with file output
@@ -26,7 +30,7 @@ async def push_cache(remove_after: bool = False) -> bool:
     Pushes completed work to S3, optionally removing the local cache after pushing.
 
     Work is pushed to S3 in the following manner:
-    - Each completed target is pushed to S3.
+    - Each completed domain is pushed to S3 as a single tar archive of its files.
     - If remove_after is True, the local cache is removed after pushing to S3.
     - If remove_after is True, empty parent paths are removed after pushing to S3.
 
@@ -44,6 +48,9 @@ async def push_cache(remove_after: bool = False) -> bool:
         # parent paths to remove
         parent_paths = set()
 
+        # uploads in flight on the shared S3 thread pool
+        pending: Set[concurrent.futures.Future] = set()
+
         # iterate over tuples of completed targets
         for path_targets in get_completed_paths():
             # submit each target to the thread pool
@@ -54,16 +61,26 @@ async def push_cache(remove_after: bool = False) -> bool:
                 paths=num_paths,
             )
 
-            # iterate over each path target
-            for target_path in path_targets:
-                copy_object(
-                    source_path=target_path,
+            # wait for a free connection before submitting another upload
+            if len(pending) >= DEFAULT_S3_POOL_SIZE:
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    future.result()
+
+            # upload the domain's files as one archive
+            pending.add(
+                S3_THREAD_POOL.submit(
+                    copy_domain_archive,
+                    source_paths=path_targets,
                     s3_client=S3_CLIENT,
                     dest_bucket=DEFAULT_S3_BUCKET,
-                    dest_key=target_path.relative_to(DEFAULT_CACHE_PATH).as_posix(),
+                    dest_key=get_domain_archive_key(domain_name),
                     remove_after=remove_after,
                 )
-                num_paths += 1
+            )
+            num_paths += len(path_targets)
             num_domains += 1
             prog_bar.update(1)
 
@@ -77,6 +94,10 @@ async def push_cache(remove_after: bool = False) -> bool:
             paths=num_paths,
         )
 
+        # wait for the remaining uploads and raise any failure
+        for future in concurrent.futures.as_completed(pending):
+            future.result()
+
         # clean up all empty parent paths
         if remove_after:
             prog_bar.set_description("Cleaning up parent paths...")
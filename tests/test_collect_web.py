@@ -0,0 +1,20 @@
+# package imports
+import pytest
+
+from alea_web_survey.tasks.collect_web import size_to_str
+
+
+@pytest.mark.parametrize(
+    "num_bytes, expected",
+    [
+        (0, "0.0 B"),
+        (735, "735.0 B"),
+        (1024, "1.0 KB"),
+        (1536, "1.5 KB"),
+        (1048575, "1024.0 KB"),
+        (5 * 1024**3, "5.0 GB"),
+        (2048 * 1024**8, "2048.0 YB"),
+    ],
+)
+def test_size_to_str(num_bytes, expected):
+    assert size_to_str(num_bytes) == expected
@@ -0,0 +1,77 @@
+# imports
+import asyncio
+import concurrent.futures
+from types import SimpleNamespace
+
+# package imports
+import pytest
+
+from alea_web_survey.collection.http.web_client import WebResourceCollector
+from alea_web_survey.tasks import collect_web_parallel
+from alea_web_survey.tasks.collect_web_parallel import collect_domain_sync
+
+
+@pytest.fixture
+def fake_get_resources(monkeypatch):
+    calls = []
+
+    async def get_resources(self, domain, paths=None):
+        calls.append((domain, self, asyncio.get_running_loop()))
+        if domain == "bad.example":
+            raise RuntimeError("failed")
+        yield SimpleNamespace(size=10)
+
+    monkeypatch.setattr(WebResourceCollector, "get_resources", get_resources)
+    return calls
+
+
+def test_collect_domain_sync_reuses_worker_loop(monkeypatch, fake_get_resources):
+    loop = asyncio.new_event_loop()
+    collector = WebResourceCollector(max_domains=1)
+    monkeypatch.setattr(collect_web_parallel, "WORKER_EVENT_LOOP", loop)
+    monkeypatch.setattr(collect_web_parallel, "WORKER_COLLECTOR", collector)
+    try:
+        domains = ["a.example", "bad.example", "b.example"]
+        results = [collect_domain_sync(domain) for domain in domains]
+        assert results == [(1, 10, 1), (0, 0, 0), (1, 10, 1)]
+
+        # every domain ran on the worker's loop with the worker's collector
+        assert [call[0] for call in fake_get_resources] == domains
+        assert all(call[1] is collector for call in fake_get_resources)
+        assert all(call[2] is loop for call in fake_get_resources)
+    finally:
+        loop.run_until_complete(collector.aclose())
+        loop.close()
+
+
+def test_collect_domain_sync_without_worker(monkeypatch, fake_get_resources):
+    closed = []
+
+    async def aclose(self):
+        closed.append(self)
+
+    monkeypatch.setattr(WebResourceCollector, "aclose", aclose)
+    assert collect_domain_sync("a.example") == (1, 10, 1)
+
+    # a temporary collector is created and closed for the domain
+    assert closed == [fake_get_resources[0][1]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("failure", ["init_domain_generator", "generate_domain_batch"])
+async def test_collect_sites_parallel_generation_fails(monkeypatch, failure):
+    def fail(*args):
+        raise RuntimeError("generation failed")
+
+    # run the pools as threads so the patched functions are used
+    monkeypatch.setattr(
+        collect_web_parallel,
+        "ProcessPoolExecutor",
+        concurrent.futures.ThreadPoolExecutor,
+    )
+    monkeypatch.setattr(collect_web_parallel, "init_collect_worker", lambda: None)
+    monkeypatch.setattr(collect_web_parallel, failure, fail)
+    result = await asyncio.wait_for(
+        collect_web_parallel.collect_sites_parallel(max_sites=2, max_workers=2), 5
+    )
+    assert result is False
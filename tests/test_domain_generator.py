@@ -0,0 +1,115 @@
+# imports
+import collections
+import json
+
+# package imports
+import httpx
+import pytest
+
+from alea_web_survey.collection.dns import domain_generator
+from alea_web_survey.collection.dns.domain_generator import DomainGenerator
+
+TLD_PAGE = b"<html><body><table><tr><td>.com</td><td>.ly</td><td>x</td></tr></table></body></html>"
+
+
+@pytest.fixture
+def data_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(domain_generator, "DEFAULT_DATA_PATH", tmp_path)
+    return tmp_path
+
+
+def test_string_to_domain():
+    assert (
+        DomainGenerator.string_to_domain("Hello World's-Site.COM")
+        == "helloworlds-site.com"
+    )
+
+
+def test_get_words_with_suffix():
+    generator = DomainGenerator.__new__(DomainGenerator)
+    generator.reverse_words = DomainGenerator.build_reverse_trie(
+        ["family", "fly", "ly", "income", "sitcom", "com"]
+    )
+    generator._words_by_suffix = {}
+    assert sorted(generator.get_words_with_suffix("ly")) == ["family", "fly"]
+    assert generator.get_words_with_suffix("com") == ["sitcom"]
+    assert generator.get_words_with_suffix("org") == []
+
+
+def test_load_tld_list_stores_validators(data_path, monkeypatch):
+    def fake_get(url, headers=None):
+        assert headers == {}
+        return httpx.Response(
+            200,
+            content=TLD_PAGE,
+            headers={"ETag": '"v1"'},
+            request=httpx.Request("GET", url),
+        )
+
+    monkeypatch.setattr(domain_generator.httpx, "get", fake_get)
+    assert DomainGenerator.load_tld_list() == ["com", "ly"]
+    assert json.loads((data_path / "tld.json").read_text()) == ["com", "ly"]
+    assert (data_path / "tld.etag").read_text() == '"v1"'
+    assert not (data_path / "tld.last_modified").exists()
+
+
+def test_load_tld_list_not_modified(data_path, monkeypatch):
+    (data_path / "tld.json").write_text(json.dumps(["org"]))
+    (data_path / "tld.etag").write_text('"v1"')
+
+    def fake_get(url, headers=None):
+        assert headers == {"If-None-Match": '"v1"'}
+        return httpx.Response(304, request=httpx.Request("GET", url))
+
+    monkeypatch.setattr(domain_generator.httpx, "get", fake_get)
+    assert DomainGenerator.load_tld_list() == ["org"]
+    assert DomainGenerator.load_tld_list(force_update=True) == ["org"]
+
+
+def test_generate_uses_cached_method_table():
+    generator = DomainGenerator.__new__(DomainGenerator)
+    generator._method_tables = collections.OrderedDict()
+    generator.get_random_known_domain = lambda: "known.com"
+    generator.get_random_words_domain = lambda: "words.com"
+    weights = {"get_random_known_domain": 0.0, "get_random_words_domain": 1.0}
+    assert generator.generate(weights) == "words.com"
+    methods, cum_weights = generator.get_method_table(weights)
+    assert cum_weights == (0.0, 1.0)
+    assert methods[1]() == "words.com"
+    assert generator.get_method_table(weights)[0] is methods
+
+
+def test_generate_skips_unknown_methods():
+    generator = DomainGenerator.__new__(DomainGenerator)
+    generator._method_tables = collections.OrderedDict()
+    generator.get_random_words_domain = lambda: "words.com"
+    weights = {"get_random_typo_domain": 0.9, "get_random_words_domain": 0.1}
+    assert generator.generate(weights) == "words.com"
+    assert generator.get_method_table(weights)[1] == (0.1,)
+
+    with pytest.raises(ValueError):
+        generator.generate({"get_random_typo_domain": 1.0})
+
+
+def test_method_table_cache_bounded():
+    generator = DomainGenerator.__new__(DomainGenerator)
+    generator._method_tables = collections.OrderedDict()
+    generator.get_random_known_domain = lambda: "known.com"
+
+    # fresh dicts with equal contents share one table
+    for _ in range(3):
+        generator.get_method_table({"get_random_known_domain": 1.0})
+    assert len(generator._method_tables) == 1
+
+    # a dict mutated in place gets a new table
+    weights = {"get_random_known_domain": 1.0}
+    generator.get_method_table(weights)
+    weights["get_random_known_domain"] = 2.0
+    assert generator.get_method_table(weights)[1] == (2.0,)
+
+    for weight in range(100):
+        generator.get_method_table({"get_random_known_domain": float(weight)})
+    assert (
+        len(generator._method_tables)
+        == domain_generator.DEFAULT_METHOD_TABLE_CACHE_SIZE
+    )
@@ -0,0 +1,95 @@
+# imports
+import io
+
+# package imports
+import botocore.exceptions
+import botocore.response
+import pytest
+
+from alea_web_survey.models import web_resource
+from alea_web_survey.models.web_resource import WebResource, utc_now
+from alea_web_survey.storage.s3 import copy_domain_archive, get_domain_archive_key
+from alea_web_survey.tasks import get_resource as get_resource_module
+from alea_web_survey.tasks.get_resource import get_resource, load_domain_archive
+
+URL = "https://example.com/robots.txt"
+
+
+class FakeS3Client:
+    def __init__(self):
+        self.objects = {}
+        self.requested_keys = []
+
+    def upload_fileobj(self, fileobj, bucket, key, Config=None):
+        self.objects[key] = fileobj.read()
+
+    def get_object(self, Bucket, Key):
+        self.requested_keys.append(Key)
+        if Key not in self.objects:
+            raise botocore.exceptions.ClientError(
+                {"Error": {"Code": "NoSuchKey"}}, "GetObject"
+            )
+        data = self.objects[Key]
+        return {"Body": botocore.response.StreamingBody(io.BytesIO(data), len(data))}
+
+
+@pytest.fixture
+def s3_client(tmp_path, monkeypatch):
+    client = FakeS3Client()
+    monkeypatch.setattr(get_resource_module, "S3_CLIENT", client)
+    monkeypatch.setattr(get_resource_module, "DEFAULT_CACHE_PATH", tmp_path)
+    load_domain_archive.cache_clear()
+    web_resource.LOADED_RESOURCE_CACHE.clear()
+    yield client
+    load_domain_archive.cache_clear()
+    web_resource.LOADED_RESOURCE_CACHE.clear()
+
+
+@pytest.fixture
+def cached_resource(tmp_path):
+    resource = WebResource(
+        url=URL,
+        status=200,
+        ip="123.123.123.123",
+        hash="123456",
+        size=14,
+        content=b"User-agent: *\n",
+        content_type="text/plain",
+        date_retrieved=utc_now(),
+    )
+    resource.save_to_cache(tmp_path)
+    web_resource.LOADED_RESOURCE_CACHE.clear()
+    return WebResource.get_cache_path(URL, tmp_path)
+
+
+def test_get_resource_from_domain_archive(s3_client, cached_resource):
+    domain_path = cached_resource.parent
+    copy_domain_archive(
+        tuple(domain_path.iterdir()),
+        s3_client,
+        "bucket",
+        get_domain_archive_key(domain_path.name),
+        remove_after=True,
+    )
+    assert not cached_resource.exists()
+
+    assert get_resource(URL) == b"User-agent: *\n"
+    assert s3_client.requested_keys == ["example.com.tar"]
+
+
+@pytest.mark.parametrize("legacy", [False, True])
+def test_get_resource_from_object(s3_client, cached_resource, tmp_path, legacy):
+    # upload the resource under its own key, as earlier versions did
+    s3_key = WebResource.get_cache_path(URL, tmp_path, legacy).relative_to(tmp_path)
+    s3_client.objects[s3_key.as_posix()] = cached_resource.read_bytes()
+    cached_resource.unlink()
+
+    assert get_resource(URL) == b"User-agent: *\n"
+    assert s3_client.requested_keys[0] == "example.com.tar"
+    assert s3_client.requested_keys[-1] == s3_key.as_posix()
+
+
+def test_get_resource_not_found(s3_client):
+    with pytest.raises(FileNotFoundError):
+        get_resource(URL)
+    assert len(s3_client.requested_keys) == 3
@@ -0,0 +1,172 @@
+# imports
+import asyncio
+import hashlib
+import threading
+
+# package imports
+import pytest
+
+from alea_web_survey.collection.http.web_client import (
+    WebResourceCollector,
+    async_lru,
+)
+
+
+@pytest.mark.asyncio
+async def test_async_lru_runs_once_per_key():
+    calls = []
+
+    @async_lru(key="url", maxsize=8)
+    async def fetch(client, url):
+        calls.append(url)
+        await asyncio.sleep(0)
+        return url.upper()
+
+    results = await asyncio.gather(
+        fetch(object(), "a"), fetch(object(), "a"), fetch(object(), url="b")
+    )
+    assert results == ["A", "A", "B"]
+    assert await fetch(None, "a") == "A"
+    assert calls == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_async_lru_retries_failures():
+    calls = []
+
+    @async_lru(key="value", maxsize=8)
+    async def flaky(value):
+        calls.append(value)
+        if len(calls) == 1:
+            raise ValueError("first call fails")
+        return value
+
+    with pytest.raises(ValueError):
+        await flaky(1)
+    assert await flaky(1) == 1
+    assert calls == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_async_lru_retries_none():
+    calls = []
+
+    @async_lru(key="value", maxsize=8)
+    async def lookup(value):
+        calls.append(value)
+        return None if len(calls) == 1 else value
+
+    assert await lookup(1) is None
+    assert await lookup(1) == 1
+    assert await lookup(1) == 1
+    assert calls == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_async_lru_evicts_oldest():
+    calls = []
+
+    @async_lru(key="value", maxsize=2)
+    async def identity(value):
+        calls.append(value)
+        return value
+
+    for value in (1, 2, 3, 1):
+        await identity(value)
+    assert calls == [1, 2, 3, 1]
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        (b"<html><body>hello</body></html>", False),
+        (b"<NOSCRIPT>Please enable JavaScript</NOSCRIPT>", True),
+        (b"<noscript><img src='pixel.gif'></noscript> javascript", False),
+        (b"<noscript>" + b" " * 300 + b"javascript", False),
+        (b"<noscript>enable javascript", True),
+    ],
+)
+def test_requires_playwright(content, expected):
+    assert WebResourceCollector.requires_playwright(content) is expected
+
+
+def test_parse_robots():
+    content = (
+        b"User-agent: Googlebot\n"
+        b"Crawl-delay: 30\n"
+        b"\n"
+        b"User-agent: otherbot\n"
+        b"User-Agent: *\n"
+        b"Disallow: /private # comment\n"
+        b"CRAWL-DELAY: 2.5\n"
+        b"\n"
+        b"User-agent: thirdbot\n"
+        b"Crawl-delay: 60\n"
+        b"Sitemap: https://example.com/sitemap.xml\n"
+        b"sitemap:/news.xml\n"
+    )
+    crawl_delay, site_maps = WebResourceCollector.parse_robots(content)
+    assert crawl_delay == 2.5
+    assert site_maps == ["https://example.com/sitemap.xml", "/news.xml"]
+
+
+def test_parse_robots_without_default_group():
+    crawl_delay, site_maps = WebResourceCollector.parse_robots(
+        b"User-agent: Googlebot\nCrawl-delay: 10\nDisallow: /\n"
+    )
+    assert crawl_delay is None
+    assert site_maps == []
+
+
+@pytest.mark.asyncio
+async def test_crawl_domains_bounds_concurrency(monkeypatch):
+    active = 0
+    peak = 0
+
+    async def fake_get_resources(self, domain, paths=None):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        if domain == "bad.example":
+            raise RuntimeError("failed")
+        yield domain
+
+    monkeypatch.setattr(WebResourceCollector, "get_resources", fake_get_resources)
+    collector = WebResourceCollector(max_domains=2)
+    domains = ["a.example", "bad.example", "b.example", "c.example"]
+    results = [resource async for resource in collector.crawl_domains(domains)]
+    assert sorted(results) == ["a.example", "b.example", "c.example"]
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_crawl_domains_generates_off_loop(monkeypatch):
+    async def fake_get_resources(self, domain, paths=None):
+        yield domain
+
+    threads = []
+
+    def generate_domains():
+        for domain in ("a.example", "b.example", "c.example"):
+            threads.append(threading.current_thread())
+            yield domain
+
+    monkeypatch.setattr(WebResourceCollector, "get_resources", fake_get_resources)
+    collector = WebResourceCollector(max_domains=2)
+    results = [
+        resource async for resource in collector.crawl_domains(generate_domains())
+    ]
+    assert sorted(results) == ["a.example", "b.example", "c.example"]
+    assert threading.main_thread() not in threads
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [16, 1 << 20])
+async def test_hash_content(size):
+    content = bytes(range(256)) * (size // 256 or 1)
+    assert (
+        await WebResourceCollector.hash_content(content)
+        == hashlib.blake2b(content).hexdigest()
+    )
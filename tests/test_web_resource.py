@@ -3,12 +3,21 @@ import base64
 import datetime
 import json
 import lzma
+import urllib.parse
 from pathlib import Path
 
 # package imports
+import orjson
 import pytest
+import zstandard
 
-from alea_web_survey.models.web_resource import WebResource, utc_now
+from alea_web_survey.models.web_resource import (
+    RESOURCE_MAGIC,
+    RESOURCE_PREFIX,
+    WebResource,
+    split_url,
+    utc_now,
+)
 
 
 @pytest.fixture
@@ -80,12 +89,139 @@ def test_web_resource_content_compression(sample_web_resource, tmp_path):
     file_path = tmp_path / "compressed_resource.json"
     sample_web_resource.save(file_path)
 
-    with file_path.open("rb") as f:
-        saved_data = json.load(f)
+    saved_data = file_path.read_bytes()
+    magic, header_length = RESOURCE_PREFIX.unpack_from(saved_data)
+    assert magic == RESOURCE_MAGIC
 
-    # Check if content is base64 encoded
-    decoded_content = base64.b64decode(saved_data["content"])
-    # Check if content is compressed
-    decompressed_content = lzma.decompress(decoded_content)
+    # Check the header holds the metadata but not the content
+    header = json.loads(
+        saved_data[RESOURCE_PREFIX.size : RESOURCE_PREFIX.size + header_length]
+    )
+    assert header["url"] == sample_web_resource.url
+    assert "content" not in header
 
+    # Check if content is compressed
+    decompressed_content = zstandard.ZstdDecompressor().decompress(
+        saved_data[RESOURCE_PREFIX.size + header_length :]
+    )
     assert decompressed_content == sample_web_resource.content
+
+
+def test_web_resource_load_legacy_format(sample_web_resource, tmp_path):
+    file_path = tmp_path / "legacy_resource.json"
+    file_path.write_text(
+        json.dumps(
+            {
+                "url": sample_web_resource.url,
+                "ip": sample_web_resource.ip,
+                "status": sample_web_resource.status,
+                "hash": sample_web_resource.hash,
+                "size": sample_web_resource.size,
+                "content": base64.b64encode(
+                    lzma.compress(sample_web_resource.content)
+                ).decode("utf-8"),
+                "content_type": sample_web_resource.content_type,
+                "headers": {},
+                "date_retrieved": sample_web_resource.date_retrieved.isoformat(),
+                "date_modified": None,
+            }
+        )
+    )
+
+    loaded_resource = WebResource.from_file(file_path)
+    assert loaded_resource.content == sample_web_resource.content
+    assert loaded_resource.date_retrieved == sample_web_resource.date_retrieved
+
+
+def test_web_resource_load_from_legacy_cache_path(sample_web_resource, tmp_path):
+    cache_file = WebResource.get_cache_path(
+        sample_web_resource.url, tmp_path, legacy=True
+    )
+    sample_web_resource.save(cache_file)
+    assert cache_file.suffix == ".json"
+    cache_path = WebResource.get_cache_path(sample_web_resource.url, tmp_path)
+    assert cache_path.suffix == ".awr"
+
+    loaded_resource = WebResource.load_from_cache(sample_web_resource.url, tmp_path)
+    assert loaded_resource.content == sample_web_resource.content
+    assert WebResource.load_from_cache("https://example.com/missing", tmp_path) is None
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://example.com",
+        "https://example.com/",
+        "https://example.com/robots.txt?x=1#top",
+        "http://example.com:8080/a/b;params?q",
+        "https://example.com/a;b/c;d",
+        "https://user@example.com#/path",
+        "example.com/relative",
+    ],
+)
+def test_split_url_matches_urlparse(url):
+    parsed_url = urllib.parse.urlparse(url)
+    assert split_url(url) == (parsed_url.netloc, parsed_url.path)
+
+
+def test_web_resource_save_skips_unchanged_content(sample_web_resource, tmp_path):
+    file_path = tmp_path / "unchanged_resource.awr"
+    sample_web_resource.save(file_path)
+    saved_data = file_path.read_bytes()
+
+    # Same hash: the existing file is kept as-is
+    sample_web_resource.status = 404
+    sample_web_resource.save(file_path)
+    assert file_path.read_bytes() == saved_data
+
+    # New hash: the file is rewritten
+    sample_web_resource.hash = "654321"
+    sample_web_resource.save(file_path)
+    assert WebResource.from_file(file_path).status == 404
+
+
+def test_web_resource_compression_cache_keyed_on_content(sample_web_resource, tmp_path):
+    # Same hash and size, different bodies: each file keeps its own body
+    first = sample_web_resource.model_copy(
+        update={"hash": "h", "size": 3, "content": b"AAA"}
+    )
+    second = first.model_copy(update={"content": b"BBB"})
+    first.save(tmp_path / "first.awr")
+    second.save(tmp_path / "second.awr")
+    assert WebResource.from_file(tmp_path / "first.awr").content == b"AAA"
+    assert WebResource.from_file(tmp_path / "second.awr").content == b"BBB"
+
+
+def test_web_resource_codec_in_header(sample_web_resource, tmp_path):
+    file_path = tmp_path / "codec_resource.awr"
+    sample_web_resource.save(file_path)
+    assert WebResource.header_from_file(file_path)["codec"] == "zstd"
+
+    # An xz body is decoded according to the header's codec id
+    header = orjson.dumps({**WebResource.header_from_file(file_path), "codec": "xz"})
+    file_path.write_bytes(
+        RESOURCE_PREFIX.pack(RESOURCE_MAGIC, len(header))
+        + header
+        + lzma.compress(sample_web_resource.content)
+    )
+    assert WebResource.from_file(file_path).content == sample_web_resource.content
+
+
+def test_web_resource_load_from_cache_memoized(sample_web_resource, tmp_path):
+    sample_web_resource.save_to_cache(tmp_path)
+    cache_file = WebResource.get_cache_path(sample_web_resource.url, tmp_path)
+    first = WebResource.load_from_cache(sample_web_resource.url, tmp_path)
+
+    # Served from memory, as an independent copy
+    cache_file.unlink()
+    first.status = 500
+    second = WebResource.load_from_cache(sample_web_resource.url, tmp_path)
+    assert second.content == sample_web_resource.content
+    assert second.status == 200
+
+    # Saving replaces the remembered copy
+    sample_web_resource.hash = "654321"
+    sample_web_resource.content = b"Updated content"
+    sample_web_resource.save_to_cache(tmp_path)
+    third = WebResource.load_from_cache(sample_web_resource.url, tmp_path)
+    assert third.content == b"Updated content"